@@ -178,6 +178,11 @@ switch ($action) {
         echo json_encode(apiCall("/api/history{$query}"));
         break;
     
+    case 'get_history_log':
+        $id = intval($_REQUEST['id'] ?? 0);
+        echo json_encode(apiCall("/api/history/{$id}/log"));
+        break;
+    
     case 'get_stats':
         $days = intval($_REQUEST['days'] ?? 30);
         echo json_encode(apiCall("/api/stats?days={$days}"));
@@ -7,26 +7,63 @@ Author: Tegenett
 """
 
 import os
-import sys
 import time
 import json
+import gzip
+import queue
+import random
 import sqlite3
 import logging
+import shlex
+import shutil
 import signal
 import socket
+import ssl
 import subprocess
+import tempfile
 import threading
 import re
-from pathlib import Path
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from contextlib import contextmanager
+from dataclasses import make_dataclass
+from functools import lru_cache
+from operator import itemgetter
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import parse_qs, urlparse
+import http.client
+
+# Optional fast JSON backend - Unraid's bundled Python does not ship orjson,
+# so fall back to the stdlib json module when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ============================================
 # CONFIGURATION
 # ============================================
 
+def _to_bool(val):
+    """Convert a settings value (bool, int or 'true'/'1'/'yes' string) to bool"""
+    if isinstance(val, str):
+        return val.lower() in ('true', '1', 'yes')
+    return bool(val)
+
+def _spawn(cmd, **kwargs):
+    """
+    Popen without close_fds so CPython can launch via posix_spawn (vfork-based)
+    instead of fork+exec, which has to copy the daemon's page tables first.
+    Safe here: every fd Python opens is non-inheritable (PEP 446) and SQLite
+    opens its files O_CLOEXEC, so nothing leaks into the child.
+    Not usable with cwd/preexec_fn/start_new_session - those force the fork path.
+    """
+    # posix_spawn is only taken for an executable given with a directory
+    if not os.path.dirname(cmd[0]):
+        kwargs.setdefault('executable', shutil.which(cmd[0]) or cmd[0])
+    return subprocess.Popen(cmd, close_fds=False, **kwargs)
+
 class Config:
     PLUGIN_NAME = "atp_backup"
     CONFIG_DIR = f"/boot/config/plugins/{PLUGIN_NAME}"
@@ -41,6 +78,7 @@ class Config:
         "SERVER_PORT": 39982,
         "LOG_LEVEL": "INFO",
         "LOG_MAX_LINES": 10000,
+        "LOG_OUTPUT_MAX_LINES": 5000,         # Tail of rsync output kept per history entry
         "DISCORD_WEBHOOK_URL": "",
         "DISCORD_NOTIFY_START": True,
         "DISCORD_NOTIFY_SUCCESS": True,
@@ -75,55 +113,129 @@ class Config:
     
     C = DEFAULTS.copy()
     
+    # Bytes last written to settings.json (lets save() skip unchanged writes)
+    _last_saved = None
+    
+    # Setting key -> type conversion applied by load() and save()
+    COERCE = {
+        **dict.fromkeys((
+            "SERVER_PORT", "LOG_MAX_LINES", "LOG_OUTPUT_MAX_LINES", "DISCORD_SUMMARY_HOUR",
+            "DEFAULT_BANDWIDTH_LIMIT", "UD_MOUNT_TIMEOUT",
+            "WOL_WAIT_TIMEOUT", "WOL_PING_INTERVAL", "SMB_SETTLE_TIME",
+            "RETRY_INTERVAL_MINUTES", "RETRY_MAX_ATTEMPTS",
+            "DISCORD_WEEKLY_DAY", "DISCORD_WEEKLY_HOUR", "DISCORD_MONTHLY_DAY", "DISCORD_MONTHLY_HOUR"
+        ), int),
+        **dict.fromkeys((
+            "ENABLED", "DISCORD_DAILY_SUMMARY", "UNRAID_NOTIFICATIONS", "RETRY_ON_FAILURE"
+        ), _to_bool),
+    }
+    
+    _dirs_ensured = False
+    
     @classmethod
-    def load(cls):
-        """Load configuration from settings.json"""
+    def _ensure_dirs(cls):
+        """Create config/data/log directories (only once per process)"""
+        if cls._dirs_ensured:
+            return
         os.makedirs(cls.CONFIG_DIR, exist_ok=True)
-        os.makedirs(cls.DATA_DIR, exist_ok=True)
         os.makedirs(os.path.join(cls.DATA_DIR, "logs"), exist_ok=True)
+        cls._dirs_ensured = True
+    
+    @classmethod
+    def load(cls):
+        """Load configuration from settings.json"""
+        cls._ensure_dirs()
         
         path = os.path.join(cls.CONFIG_DIR, cls.SETTINGS_FILE)
         if os.path.exists(path):
             try:
-                with open(path, 'r') as f:
-                    loaded = json.load(f)
-                    cls.C.update(loaded)
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                loaded = orjson.loads(raw) if orjson else json.loads(raw)
+                cls.C.update(loaded)
             except Exception as e:
                 print(f"[Config] Load error: {e}")
         
-        # Type conversions
-        int_keys = ["SERVER_PORT", "LOG_MAX_LINES", "DISCORD_SUMMARY_HOUR", 
-                    "DEFAULT_BANDWIDTH_LIMIT", "UD_MOUNT_TIMEOUT", 
-                    "WOL_WAIT_TIMEOUT", "WOL_PING_INTERVAL", "SMB_SETTLE_TIME",
-                    "RETRY_INTERVAL_MINUTES", "RETRY_MAX_ATTEMPTS"]
-        for key in int_keys:
+        cls._coerce()
+
+        # Resolved logging settings, read once by the logging setup below
+        cls.LOG_LEVEL_INT = getattr(logging, str(cls.C.get('LOG_LEVEL', 'INFO')).upper(), logging.INFO)
+        try:
+            cls.LOG_MAX_BYTES = int(cls.C.get('LOG_MAX_SIZE_KB', 5000)) * 1024  # Default 5MB
+            cls.LOG_KEEP_COUNT = int(cls.C.get('LOG_KEEP_COUNT', 5))
+        except (ValueError, TypeError):
+            cls.LOG_MAX_BYTES = 5000 * 1024
+            cls.LOG_KEEP_COUNT = 5
+
+        cls._refresh_settings()
+        BandwidthScheduler.rebuild_cache()
+    
+    @staticmethod
+    def parse_rsync_options(options):
+        """Split RSYNC_OPTIONS shell-style (quoted arguments stay whole); raises ValueError"""
+        return tuple(shlex.split(str(options or '')))
+    
+    @classmethod
+    def _coerce(cls):
+        """Type conversions (single pass over the coercion table)"""
+        for key, convert in cls.COERCE.items():
             try:
-                cls.C[key] = int(cls.C.get(key, cls.DEFAULTS.get(key, 0)))
-            except (ValueError, TypeError):
-                cls.C[key] = cls.DEFAULTS.get(key, 0)
-        
-        # Boolean conversions
-        bool_keys = ["ENABLED", "DISCORD_DAILY_SUMMARY", "UNRAID_NOTIFICATIONS", "RETRY_ON_FAILURE"]
-        for key in bool_keys:
-            val = cls.C.get(key, cls.DEFAULTS.get(key, False))
-            if isinstance(val, str):
-                cls.C[key] = val.lower() in ('true', '1', 'yes')
-            else:
-                cls.C[key] = bool(val)
+                cls.C[key] = convert(cls.C.get(key, cls.DEFAULTS[key]))
+            except (ValueError, TypeError, AttributeError):
+                cls.C[key] = cls.DEFAULTS[key]
+    
+    @classmethod
+    def _refresh_settings(cls):
+        """Rebuild the attribute-access snapshot Config.S from Config.C"""
+        cls.S = Settings(*(cls.C.get(key, default) for key, default in cls.DEFAULTS.items()))
+        # rsync option argv, parsed once per settings change instead of per job
+        try:
+            cls.RSYNC_ARGS = cls.parse_rsync_options(cls.S.rsync_options)
+        except ValueError:
+            cls.RSYNC_ARGS = tuple(str(cls.S.rsync_options).split())
     
     @classmethod
     def save(cls):
         """Save current configuration to settings.json"""
+        cls._ensure_dirs()
         path = os.path.join(cls.CONFIG_DIR, cls.SETTINGS_FILE)
+        # API saves arrive as form strings - type them before they reach
+        # settings.json or the Config.S snapshot
+        cls._coerce()
         try:
-            with open(path, 'w') as f:
-                json.dump(cls.C, f, indent=2)
+            if orjson:
+                data = orjson.dumps(cls.C, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(cls.C, indent=2).encode()
+            
+            # Nothing changed since the last save - spare the flash drive a write
+            if data == cls._last_saved and os.path.exists(path):
+                return True, "Settings unchanged"
+            
+            # Write to a temp file and rename so a crash mid-write never
+            # leaves a truncated settings.json behind (CONFIG_DIR is on flash)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            cls._last_saved = data
+            cls._refresh_settings()
+            BandwidthScheduler.rebuild_cache()
             return True, "Settings saved"
         except Exception as e:
             return False, str(e)
 
-Config.load()
 
+# Slotted snapshot of Config.C with one lowercase attribute per DEFAULTS key
+# (e.g. Config.S.bandwidth_profile_a_limit). Hot paths read attributes instead
+# of hashing string keys; Config.C stays the source of truth for save().
+Settings = make_dataclass(
+    "Settings",
+    [(key.lower(), type(default), default) for key, default in Config.DEFAULTS.items()],
+    slots=True
+)
 
 # ============================================
 # BANDWIDTH SCHEDULER
@@ -132,94 +244,99 @@ Config.load()
 class BandwidthScheduler:
     """Calculates effective bandwidth limit based on time-of-day profiles"""
 
-    @staticmethod
-    def get_effective_limit(job_limit=0):
-        """
-        Get the effective bandwidth limit considering:
-        1. Job-specific limit (highest priority if > 0)
-        2. Scheduled profile limit (if scheduling enabled)
-        3. Default limit (fallback)
+    # Parsed profile settings (rebuilt by rebuild_cache() whenever settings change)
+    _enabled = False
+    _default = 0
+    _a_minutes = 0
+    _b_minutes = 0
+    _a_limit = 0
+    _b_limit = 0
 
-        Returns: bandwidth limit in KB/s (0 = unlimited)
+    @classmethod
+    def rebuild_cache(cls):
         """
-        # If job has specific limit, use it
-        if job_limit and int(job_limit) > 0:
-            return int(job_limit)
-
-        # Check if scheduling is enabled
-        if not Config.C.get("BANDWIDTH_SCHEDULE_ENABLED", False):
-            return int(Config.C.get("DEFAULT_BANDWIDTH_LIMIT", 0) or 0)
+        Parse the bandwidth settings once into integers so the per-call
+        lookups are reduced to a few integer compares.
+        Called from Config.load() and Config.save().
+        """
+        S = Config.S
+        try:
+            cls._default = int(S.default_bandwidth_limit or 0)
+        except (ValueError, TypeError):
+            cls._default = 0
 
-        # Get current time
-        now = datetime.now()
-        current_minutes = now.hour * 60 + now.minute
+        cls._enabled = bool(S.bandwidth_schedule_enabled)
+        if not cls._enabled:
+            return
 
-        # Parse profile start times
         try:
-            a_start = Config.C.get("BANDWIDTH_PROFILE_A_START", "22:00")
-            b_start = Config.C.get("BANDWIDTH_PROFILE_B_START", "06:00")
+            a_parts = S.bandwidth_profile_a_start.split(":")
+            b_parts = S.bandwidth_profile_b_start.split(":")
 
-            a_parts = a_start.split(":")
-            b_parts = b_start.split(":")
+            cls._a_minutes = int(a_parts[0]) * 60 + int(a_parts[1])
+            cls._b_minutes = int(b_parts[0]) * 60 + int(b_parts[1])
 
-            a_minutes = int(a_parts[0]) * 60 + int(a_parts[1])
-            b_minutes = int(b_parts[0]) * 60 + int(b_parts[1])
-        except (ValueError, IndexError):
-            # Fallback to default if parsing fails
-            return int(Config.C.get("DEFAULT_BANDWIDTH_LIMIT", 0) or 0)
+            cls._a_limit = int(S.bandwidth_profile_a_limit or 0)
+            cls._b_limit = int(S.bandwidth_profile_b_limit or 0)
+        except (ValueError, IndexError, TypeError, AttributeError):
+            # Unparseable profile settings - behave as if scheduling is disabled
+            cls._enabled = False
 
-        # Determine which profile is active
-        # Profile A: from A_START to B_START
-        # Profile B: from B_START to A_START
+    # Lookup tables indexed by _active_profile_index(): 0=Default, 1=A, 2=B
+    PROFILE_NAMES = ("Default", "Profile A (Night)", "Profile B (Day)")
 
-        a_limit = int(Config.C.get("BANDWIDTH_PROFILE_A_LIMIT", 0) or 0)
-        b_limit = int(Config.C.get("BANDWIDTH_PROFILE_B_LIMIT", 0) or 0)
+    @staticmethod
+    def current_minutes():
+        """Minutes since local midnight (time.localtime avoids building a datetime)"""
+        t = time.localtime()
+        return t.tm_hour * 60 + t.tm_min
 
-        if a_minutes < b_minutes:
-            # Simple case: A starts before B (e.g., A=06:00, B=22:00)
-            if a_minutes <= current_minutes < b_minutes:
-                return a_limit
-            else:
-                return b_limit
-        else:
-            # Wrapped case: A starts after B (e.g., A=22:00, B=06:00)
-            # Profile A is active from 22:00 to 23:59 and 00:00 to 06:00
-            if current_minutes >= a_minutes or current_minutes < b_minutes:
-                return a_limit
-            else:
-                return b_limit
+    @classmethod
+    def _active_profile_index(cls, current_minutes=None):
+        """
+        Return the index of the active profile (0=Default, 1=A, 2=B).
 
-    @staticmethod
-    def get_current_profile():
-        """Get the name of the currently active profile"""
-        if not Config.C.get("BANDWIDTH_SCHEDULE_ENABLED", False):
-            return "Default"
+        Profile A: from A_START to B_START
+        Profile B: from B_START to A_START
+        When A starts after B (e.g., A=22:00, B=06:00) the A window wraps midnight.
+        """
+        if not cls._enabled:
+            return 0
 
-        now = datetime.now()
-        current_minutes = now.hour * 60 + now.minute
+        if current_minutes is None:
+            current_minutes = cls.current_minutes()
+        a = cls._a_minutes
+        b = cls._b_minutes
 
-        try:
-            a_start = Config.C.get("BANDWIDTH_PROFILE_A_START", "22:00")
-            b_start = Config.C.get("BANDWIDTH_PROFILE_B_START", "06:00")
+        if a < b:
+            in_a = a <= current_minutes < b
+        else:
+            in_a = current_minutes >= a or current_minutes < b
+        return 1 if in_a else 2
 
-            a_parts = a_start.split(":")
-            b_parts = b_start.split(":")
+    @classmethod
+    def get_effective_limit(cls, job_limit=0, current_minutes=None):
+        """
+        Get the effective bandwidth limit considering:
+        1. Job-specific limit (highest priority if > 0)
+        2. Scheduled profile limit (if scheduling enabled)
+        3. Default limit (fallback)
 
-            a_minutes = int(a_parts[0]) * 60 + int(a_parts[1])
-            b_minutes = int(b_parts[0]) * 60 + int(b_parts[1])
-        except (ValueError, IndexError):
-            return "Default"
+        current_minutes: optional minutes since midnight, so callers that also
+        need get_current_profile() can read the clock once.
 
-        if a_minutes < b_minutes:
-            if a_minutes <= current_minutes < b_minutes:
-                return "Profile A (Night)"
-            else:
-                return "Profile B (Day)"
-        else:
-            if current_minutes >= a_minutes or current_minutes < b_minutes:
-                return "Profile A (Night)"
-            else:
-                return "Profile B (Day)"
+        Returns: bandwidth limit in KB/s (0 = unlimited)
+        """
+        if job_limit and int(job_limit) > 0:
+            return int(job_limit)
+        return (cls._default, cls._a_limit, cls._b_limit)[cls._active_profile_index(current_minutes)]
+
+    @classmethod
+    def get_current_profile(cls, current_minutes=None):
+        """Get the name of the currently active profile"""
+        return cls.PROFILE_NAMES[cls._active_profile_index(current_minutes)]
+
+Config.load()
 
 # ============================================
 # LOGGING
@@ -227,15 +344,36 @@ class BandwidthScheduler:
 
 from logging.handlers import RotatingFileHandler
 
-LOG_FILE = os.path.join(Config.DATA_DIR, "logs", f"{Config.PLUGIN_NAME}.log")
-os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+LOG_FILE = os.path.join(Config.DATA_DIR, "logs", f"{Config.PLUGIN_NAME}.log")  # Directory created by Config.load()
 
-_log_level_str = Config.C.get('LOG_LEVEL', 'INFO').upper()
-_log_level = getattr(logging, _log_level_str, logging.INFO)
+# Hoisted log path parts used by LogManager's per-file loops
+_LOG_DIR = os.path.dirname(LOG_FILE)
+_LOG_BASENAME = os.path.basename(LOG_FILE)
+_LOG_PREFIX = Config.PLUGIN_NAME
+_startswith = str.startswith  # Unbound method - skips per-entry attribute lookup in the filters
+
+_log_level = Config.LOG_LEVEL_INT
 
 # Log rotation settings from config
-_log_max_size = int(Config.C.get('LOG_MAX_SIZE_KB', 5000)) * 1024  # Default 5MB
-_log_keep_count = int(Config.C.get('LOG_KEEP_COUNT', 5))
+_log_max_size = Config.LOG_MAX_BYTES
+_log_keep_count = Config.LOG_KEEP_COUNT
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that only checks the file size every
+    ROLLOVER_CHECK_INTERVAL records instead of on every emit.
+    The log may overshoot maxBytes by at most that many lines.
+    """
+    ROLLOVER_CHECK_INTERVAL = 256
+    _emit_count = 0
+
+    def shouldRollover(self, record):
+        # Called with the handler lock held, so the counter needs no extra lock
+        self._emit_count += 1
+        if self._emit_count < self.ROLLOVER_CHECK_INTERVAL:
+            return False
+        self._emit_count = 0
+        return super().shouldRollover(record)
 
 # Create logger - use unique name and prevent propagation to root
 logger = logging.getLogger(f"{Config.PLUGIN_NAME}_daemon")
@@ -246,7 +384,7 @@ if not logger.handlers:
     logger.propagate = False  # Critical: prevents duplicate logs from root logger
     
     # Rotating file handler - automatically rotates when file exceeds max size
-    file_handler = RotatingFileHandler(
+    file_handler = BatchedRotatingFileHandler(
         LOG_FILE, 
         maxBytes=_log_max_size, 
         backupCount=_log_keep_count
@@ -265,22 +403,27 @@ class LogManager:
     @staticmethod
     def get_log_files():
         """Get list of all log files with sizes"""
-        log_dir = os.path.dirname(LOG_FILE)
-        log_files = []
-        
-        if os.path.exists(log_dir):
-            for f in os.listdir(log_dir):
-                if f.startswith(Config.PLUGIN_NAME):
-                    path = os.path.join(log_dir, f)
-                    size = os.path.getsize(path)
-                    log_files.append({'name': f, 'size': size, 'path': path})
+        if not os.path.exists(_LOG_DIR):
+            return []
+        
+        # scandir yields DirEntry objects with the path pre-joined and
+        # stat() cached, avoiding a separate getsize() call per file
+        with os.scandir(_LOG_DIR) as entries:
+            log_files = [
+                {'name': e.name, 'size': e.stat().st_size, 'path': e.path}
+                for e in entries if _startswith(e.name, _LOG_PREFIX)
+            ]
         
-        return sorted(log_files, key=lambda x: x['name'])
+        return sorted(log_files, key=itemgetter('name'))
     
     @staticmethod
     def get_total_log_size():
         """Get total size of all log files"""
-        return sum(f['size'] for f in LogManager.get_log_files())
+        if not os.path.exists(_LOG_DIR):
+            return 0
+        # Sum directly over the directory scan - no dicts or sorting needed
+        with os.scandir(_LOG_DIR) as entries:
+            return sum(e.stat().st_size for e in entries if _startswith(e.name, _LOG_PREFIX))
     
     @staticmethod
     def rotate_now():
@@ -295,21 +438,21 @@ class LogManager:
     @staticmethod
     def clear_old_logs():
         """Delete all rotated log files (keep only current)"""
-        log_dir = os.path.dirname(LOG_FILE)
         deleted = 0
         
-        for f in os.listdir(log_dir):
-            if f.startswith(Config.PLUGIN_NAME) and f != os.path.basename(LOG_FILE):
-                try:
-                    os.remove(os.path.join(log_dir, f))
-                    deleted += 1
-                except Exception as e:
-                    logger.warning(f"[LogManager] Failed to delete {f}: {e}")
+        with os.scandir(_LOG_DIR) as entries:
+            for e in entries:
+                if _startswith(e.name, _LOG_PREFIX) and e.name != _LOG_BASENAME:
+                    try:
+                        os.unlink(e.path)
+                        deleted += 1
+                    except Exception as ex:
+                        logger.warning("[LogManager] Failed to delete %s: %s", e.name, ex)
         
         logger.info(f"[LogManager] Cleared {deleted} old log files")
         return deleted
 
-START_TIME = time.time()
+START_TIME = time.monotonic()  # Monotonic so uptime survives NTP/clock changes
 
 # ============================================
 # DATABASE WITH MIGRATION
@@ -317,11 +460,22 @@ START_TIME = time.time()
 
 class Database:
     # Schema version for migrations
-    SCHEMA_VERSION = 4
+    SCHEMA_VERSION = 6
+    # Long-lived connections kept open for the lifetime of the daemon
+    POOL_SIZE = 4
     
     def __init__(self):
         self.db_path = os.path.join(Config.DATA_DIR, Config.DB_FILE)
-        self.lock = threading.RLock()
+        self._local = threading.local()  # Holds the connection of an open transaction()
+        # Cached backup_jobs rows - cleared after any commit that changed the table
+        self._jobs_cache = None
+        self._jobs_version = 0
+        self._jobs_lock = threading.Lock()
+        # Connections are opened once and reused, so the PRAGMA setup and the
+        # page cache survive between calls
+        self._pool = queue.SimpleQueue()
+        for _ in range(self.POOL_SIZE):
+            self._pool.put(self._open_db())
         self._init_db()
         self._migrate_db()
     
@@ -329,6 +483,10 @@ class Database:
         """Initialize database tables"""
         logger.info("[Database] Initializing database...")
         with self._conn() as conn:
+            # File-level settings (persist in the database file).
+            # auto_vacuum only takes effect on a database created after it is set.
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.executescript('''
                 CREATE TABLE IF NOT EXISTS backup_jobs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -371,10 +529,15 @@ class Database:
                     transfer_speed_mbps REAL DEFAULT 0,
                     error_message TEXT,
                     dry_run INTEGER DEFAULT 0,
-                    log_output TEXT,
                     FOREIGN KEY (job_id) REFERENCES backup_jobs(id) ON DELETE CASCADE
                 );
                 
+                CREATE TABLE IF NOT EXISTS backup_history_logs (
+                    history_id INTEGER PRIMARY KEY,
+                    log_output TEXT,
+                    FOREIGN KEY (history_id) REFERENCES backup_history(id) ON DELETE CASCADE
+                );
+                
                 CREATE TABLE IF NOT EXISTS daily_stats (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     date TEXT UNIQUE NOT NULL,
@@ -390,11 +553,12 @@ class Database:
                     version INTEGER PRIMARY KEY
                 );
                 
-                CREATE INDEX IF NOT EXISTS idx_history_job ON backup_history(job_id);
+                CREATE INDEX IF NOT EXISTS idx_history_job_id ON backup_history(job_id, id DESC);
                 CREATE INDEX IF NOT EXISTS idx_history_status ON backup_history(status);
                 CREATE INDEX IF NOT EXISTS idx_history_started ON backup_history(started_at);
                 CREATE INDEX IF NOT EXISTS idx_stats_date ON daily_stats(date);
             ''')
+        self.optimize()
         logger.info("[Database] Initialization complete")
     
     def _migrate_db(self):
@@ -402,37 +566,57 @@ class Database:
         with self._conn() as conn:
             # Get current schema version
             try:
-                row = conn.execute("SELECT version FROM schema_version ORDER BY version DESC LIMIT 1").fetchone()
-                current_version = row['version'] if row else 0
+                # MAX over the INTEGER PRIMARY KEY is answered from the rowid b-tree
+                current_version = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
             except:
                 current_version = 0
-            
-            logger.info(f"[Database] Current schema version: {current_version}, target: {self.SCHEMA_VERSION}")
+        
+        logger.info(f"[Database] Current schema version: {current_version}, target: {self.SCHEMA_VERSION}")
+        
+        # Common restart path: schema is current, no write transaction needed
+        if current_version >= self.SCHEMA_VERSION:
+            return
+        
+        with self._conn() as conn:
+            # Take the write lock up front so all migration steps commit atomically
+            # (DDL would otherwise run in autocommit mode)
+            conn.execute("BEGIN IMMEDIATE")
+            
+            if current_version < 6:
+                # Read both column sets in one query via the pragma table-valued
+                # functions; each migration below adds to them
+                columns, history_columns = set(), set()
+                for table, name in conn.execute('''
+                    SELECT 'backup_jobs', name FROM pragma_table_info('backup_jobs')
+                    UNION ALL
+                    SELECT 'backup_history', name FROM pragma_table_info('backup_history')
+                '''):
+                    (columns if table == 'backup_jobs' else history_columns).add(name)
             
             if current_version < 2:
                 # Migration to v2: Add retry columns
                 logger.info("[Database] Migrating to schema v2...")
                 
                 # Check if columns exist before adding
-                columns = [row['name'] for row in conn.execute("PRAGMA table_info(backup_jobs)").fetchall()]
-                
                 if 'retry_on_failure' not in columns:
                     conn.execute("ALTER TABLE backup_jobs ADD COLUMN retry_on_failure INTEGER DEFAULT 1")
+                    columns.add('retry_on_failure')
                     logger.info("[Database] Added retry_on_failure column")
                 
                 if 'retry_count' not in columns:
                     conn.execute("ALTER TABLE backup_jobs ADD COLUMN retry_count INTEGER DEFAULT 0")
+                    columns.add('retry_count')
                     logger.info("[Database] Added retry_count column")
                 
                 if 'last_retry_at' not in columns:
                     conn.execute("ALTER TABLE backup_jobs ADD COLUMN last_retry_at TIMESTAMP")
+                    columns.add('last_retry_at')
                     logger.info("[Database] Added last_retry_at column")
                 
                 # Check history table
-                history_columns = [row['name'] for row in conn.execute("PRAGMA table_info(backup_history)").fetchall()]
-                
                 if 'is_retry' not in history_columns:
                     conn.execute("ALTER TABLE backup_history ADD COLUMN is_retry INTEGER DEFAULT 0")
+                    history_columns.add('is_retry')
                     logger.info("[Database] Added is_retry column to history")
                 
                 # Update schema version
@@ -443,14 +627,14 @@ class Database:
                 # Migration to v3: Add pre/post script columns
                 logger.info("[Database] Migrating to schema v3...")
 
-                columns = [row['name'] for row in conn.execute("PRAGMA table_info(backup_jobs)").fetchall()]
-
                 if 'pre_script' not in columns:
                     conn.execute("ALTER TABLE backup_jobs ADD COLUMN pre_script TEXT")
+                    columns.add('pre_script')
                     logger.info("[Database] Added pre_script column")
 
                 if 'post_script' not in columns:
                     conn.execute("ALTER TABLE backup_jobs ADD COLUMN post_script TEXT")
+                    columns.add('post_script')
                     logger.info("[Database] Added post_script column")
 
                 conn.execute("INSERT OR REPLACE INTO schema_version (version) VALUES (?)", (3,))
@@ -460,51 +644,194 @@ class Database:
                 # Migration to v4: Add checksum verification column
                 logger.info("[Database] Migrating to schema v4...")
 
-                columns = [row['name'] for row in conn.execute("PRAGMA table_info(backup_jobs)").fetchall()]
-
                 if 'verify_checksum' not in columns:
                     conn.execute("ALTER TABLE backup_jobs ADD COLUMN verify_checksum INTEGER DEFAULT 0")
+                    columns.add('verify_checksum')
                     logger.info("[Database] Added verify_checksum column")
 
                 conn.execute("INSERT OR REPLACE INTO schema_version (version) VALUES (?)", (4,))
                 logger.info("[Database] Migration to v4 complete")
+
+            if current_version < 5:
+                # Migration to v5: Composite index for the latest-run-per-job lookup
+                logger.info("[Database] Migrating to schema v5...")
+
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_history_job_id ON backup_history(job_id, id DESC)")
+                # job_id alone is a prefix of the new index - don't maintain both on every insert
+                conn.execute("DROP INDEX IF EXISTS idx_history_job")
+
+                conn.execute("INSERT OR REPLACE INTO schema_version (version) VALUES (?)", (5,))
+                logger.info("[Database] Migration to v5 complete")
+
+            if current_version < 6:
+                # Migration to v6: Move rsync output out of the history rows
+                logger.info("[Database] Migrating to schema v6...")
+
+                if 'log_output' in history_columns:
+                    conn.execute('''
+                        INSERT OR REPLACE INTO backup_history_logs (history_id, log_output)
+                        SELECT id, log_output FROM backup_history
+                        WHERE log_output IS NOT NULL AND log_output != ''
+                    ''')
+                    if sqlite3.sqlite_version_info >= (3, 35, 0):
+                        conn.execute("ALTER TABLE backup_history DROP COLUMN log_output")
+                        history_columns.discard('log_output')
+                        logger.info("[Database] Moved log_output to backup_history_logs")
+                    else:
+                        # No DROP COLUMN before SQLite 3.35 - just release the space
+                        conn.execute("UPDATE backup_history SET log_output = NULL")
+                        logger.info("[Database] Copied log_output to backup_history_logs")
+
+                conn.execute("INSERT OR REPLACE INTO schema_version (version) VALUES (?)", (6,))
+                logger.info("[Database] Migration to v6 complete")
+
+            if current_version < self.SCHEMA_VERSION:
+                # Seed sqlite_stat1 so the planner has statistics for the new schema
+                conn.execute("ANALYZE")
+    
+    def _open_db(self):
+        """Open a connection with the daemon's standard PRAGMA settings"""
+        # Hot statements are class-level SQL_* constants so every call hits
+        # the connection's prepared statement cache instead of re-parsing
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level='DEFERRED',
+                               check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # Per-connection settings - applied once since connections are pooled.
+        # With WAL (set on the file in _init_db), synchronous=NORMAL only
+        # fsyncs at checkpoints instead of on every commit.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")       # 64 MB page cache
+        conn.execute("PRAGMA mmap_size=268435456")     # 256 MB memory-mapped reads
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
     
     @contextmanager
     def _conn(self):
         """Thread-safe database connection context manager"""
-        acquired = self.lock.acquire(timeout=30)
-        if not acquired:
-            logger.error("[Database] Could not acquire lock within 30 seconds!")
-            raise Exception("Database lock timeout")
+        active = getattr(self._local, 'conn', None)
+        if active is not None:
+            # Inside transaction(): join it, the outer block commits
+            yield active
+            return
+        
+        # No Python-level lock: each thread borrows its own connection, WAL lets
+        # readers run alongside the writer and busy_timeout serializes writers
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level='DEFERRED')
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA busy_timeout=30000")
-            conn.execute("PRAGMA foreign_keys=ON")
+            conn = self._pool.get(timeout=30)
+        except queue.Empty:
+            logger.error("[Database] No pooled connection available within 30 seconds!")
+            raise Exception("Database connection pool timeout")
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            logger.error(f"[Database] Rolling back due to error: {e}")
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+            # Drop the jobs cache only once the change is committed (or rolled back)
+            if getattr(self._local, 'jobs_changed', False):
+                self._local.jobs_changed = False
+                self._invalidate_jobs()
+    
+    def optimize(self):
+        """Let SQLite refresh query planner statistics (cheap when nothing changed)"""
+        try:
+            with self._conn() as conn:
+                conn.execute("PRAGMA optimize")
+        except Exception as e:
+            logger.warning(f"[Database] PRAGMA optimize failed: {e}")
+    
+    def close(self):
+        """Optimize and close all idle pooled connections (daemon shutdown)"""
+        while True:
             try:
-                yield conn
-                conn.commit()
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.execute("PRAGMA optimize")
+                conn.close()
             except Exception as e:
-                logger.error(f"[Database] Rolling back due to error: {e}")
-                conn.rollback()
-                raise
+                logger.warning(f"[Database] Error closing connection: {e}")
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several Database calls into a single transaction (one commit).
+        Methods called inside the block reuse this connection instead of
+        opening and committing their own.
+        """
+        with self._conn() as conn:
+            previous = getattr(self._local, 'conn', None)
+            self._local.conn = conn
+            try:
+                yield conn
             finally:
-                conn.close()
-        finally:
-            self.lock.release()
+                self._local.conn = previous
+    
+    # ---- Job cache ----
+    
+    def _jobs_changed(self):
+        """Mark backup_jobs as modified; the cache is dropped after commit"""
+        self._local.jobs_changed = True
+    
+    def _invalidate_jobs(self):
+        with self._jobs_lock:
+            self._jobs_version += 1
+            self._jobs_cache = None
+    
+    @property
+    def jobs_version(self):
+        """Bumped after every committed job change (lets callers cache data derived from jobs)"""
+        return self._jobs_version
+    
+    def _all_jobs(self):
+        """
+        All jobs ordered by name. The scheduler polls this every minute but
+        the table rarely changes, so rows are cached until a job write commits.
+        """
+        cache = self._jobs_cache
+        if cache is not None:
+            return cache
+        
+        version = self._jobs_version
+        with self._conn() as conn:
+            cache = [dict(row) for row in conn.execute("SELECT * FROM backup_jobs ORDER BY name")]
+        with self._jobs_lock:
+            # Only keep the result if no write committed while we were reading
+            if version == self._jobs_version:
+                self._jobs_cache = cache
+        return cache
     
     # ---- Job CRUD ----
+    # Getters return copies so callers can annotate jobs without touching the cache
     
     def get_jobs(self):
-        with self._conn() as conn:
-            rows = conn.execute("SELECT * FROM backup_jobs ORDER BY name").fetchall()
-            return [dict(row) for row in rows]
+        return [job.copy() for job in self._all_jobs()]
     
     def get_enabled_jobs(self):
-        with self._conn() as conn:
-            rows = conn.execute("SELECT * FROM backup_jobs WHERE enabled = 1 ORDER BY name").fetchall()
-            return [dict(row) for row in rows]
+        return [job.copy() for job in self._all_jobs() if job['enabled']]
+    
+    # Correlated subquery resolves each job's latest run straight from
+    # idx_history_job_id instead of grouping the whole history table
+    SQL_FAILED_JOBS_FOR_RETRY = '''
+        SELECT j.* FROM backup_jobs j
+        WHERE j.enabled = 1 
+        AND j.retry_on_failure = 1
+        AND j.retry_count < ?
+        AND (j.last_retry_at IS NULL OR 
+             datetime(j.last_retry_at, '+' || ? || ' minutes') <= datetime('now'))
+        AND (
+            SELECT status FROM backup_history
+            WHERE job_id = j.id
+            ORDER BY id DESC LIMIT 1
+        ) = 'failed'
+    '''
     
     def get_failed_jobs_for_retry(self):
         """Get jobs that failed and need retry"""
@@ -512,128 +839,102 @@ class Database:
             max_retries = int(Config.C.get("RETRY_MAX_ATTEMPTS", 3) or 3)
             retry_interval = int(Config.C.get("RETRY_INTERVAL_MINUTES", 60) or 60)
             
-            rows = conn.execute('''
-                SELECT j.* FROM backup_jobs j
-                INNER JOIN (
-                    SELECT job_id, MAX(id) as last_id 
-                    FROM backup_history 
-                    GROUP BY job_id
-                ) h ON j.id = h.job_id
-                INNER JOIN backup_history bh ON bh.id = h.last_id
-                WHERE j.enabled = 1 
-                AND j.retry_on_failure = 1
-                AND bh.status = 'failed'
-                AND j.retry_count < ?
-                AND (j.last_retry_at IS NULL OR 
-                     datetime(j.last_retry_at, '+' || ? || ' minutes') <= datetime('now'))
-            ''', (max_retries, retry_interval)).fetchall()
+            rows = conn.execute(self.SQL_FAILED_JOBS_FOR_RETRY,
+                                (max_retries, retry_interval)).fetchall()
             return [dict(row) for row in rows]
     
     def get_job(self, job_id):
-        with self._conn() as conn:
-            row = conn.execute("SELECT * FROM backup_jobs WHERE id = ?", (job_id,)).fetchone()
-            return dict(row) if row else None
+        for job in self._all_jobs():
+            if job['id'] == job_id:
+                return job.copy()
+        return None
+    
+    # (column, default, coercion) for every user-editable job field - single
+    # source for the INSERT/UPDATE column lists and their parameter tuples
+    JOB_COLUMNS = (
+        ('name', None, None),
+        ('job_type', 'local', None),
+        ('source_path', None, None),
+        ('dest_path', None, None),
+        ('remote_host', None, None),
+        ('remote_share', None, None),
+        ('remote_mount_point', None, None),
+        ('remote_user', None, None),
+        ('remote_pass', None, None),
+        ('mac_address', None, None),
+        ('use_wol', 0, int),
+        ('shutdown_after', 0, int),
+        ('schedule_type', 'disabled', None),
+        ('schedule_hour', 0, int),
+        ('schedule_minute', 0, int),
+        ('schedule_day', 0, int),
+        ('schedule_cron', None, None),
+        ('bandwidth_limit', 0, int),
+        ('exclude_patterns', None, None),
+        ('retention_count', 0, int),
+        ('retention_days', 0, int),
+        ('enabled', 1, int),
+        ('retry_on_failure', 1, int),
+        ('pre_script', None, None),
+        ('post_script', None, None),
+        ('verify_checksum', 0, int),
+    )
+    
+    SQL_CREATE_JOB = (
+        f"INSERT INTO backup_jobs ({', '.join(c for c, _, _ in JOB_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(JOB_COLUMNS))})"
+    )
+    SQL_UPDATE_JOB = (
+        f"UPDATE backup_jobs SET {', '.join(c + ' = ?' for c, _, _ in JOB_COLUMNS)}, "
+        f"updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+    )
+    
+    def _job_values(self, job_data):
+        get = job_data.get
+        return [coerce(get(col, default)) if coerce else get(col, default)
+                for col, default, coerce in self.JOB_COLUMNS]
+    
+    # Exported job fields: everything create_job() takes except the password
+    # (ids, timestamps and retry state are recreated on import)
+    EXPORT_COLUMNS = tuple(c for c, _, _ in JOB_COLUMNS if c != 'remote_pass')
+    
+    def get_jobs_for_export(self):
+        columns = self.EXPORT_COLUMNS
+        return [{col: job[col] for col in columns} for job in self._all_jobs()]
     
     def create_job(self, job_data):
         logger.info(f"[Database] Creating job: {job_data.get('name')}")
         with self._conn() as conn:
-            cursor = conn.execute('''
-                INSERT INTO backup_jobs (name, job_type, source_path, dest_path,
-                    remote_host, remote_share, remote_mount_point, remote_user, remote_pass,
-                    mac_address, use_wol, shutdown_after, schedule_type,
-                    schedule_hour, schedule_minute, schedule_day, schedule_cron,
-                    bandwidth_limit, exclude_patterns, retention_count, retention_days,
-                    enabled, retry_on_failure, pre_script, post_script, verify_checksum)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_data.get('name'),
-                job_data.get('job_type', 'local'),
-                job_data.get('source_path'),
-                job_data.get('dest_path'),
-                job_data.get('remote_host'),
-                job_data.get('remote_share'),
-                job_data.get('remote_mount_point'),
-                job_data.get('remote_user'),
-                job_data.get('remote_pass'),
-                job_data.get('mac_address'),
-                int(job_data.get('use_wol', 0)),
-                int(job_data.get('shutdown_after', 0)),
-                job_data.get('schedule_type', 'disabled'),
-                int(job_data.get('schedule_hour', 0)),
-                int(job_data.get('schedule_minute', 0)),
-                int(job_data.get('schedule_day', 0)),
-                job_data.get('schedule_cron'),
-                int(job_data.get('bandwidth_limit', 0)),
-                job_data.get('exclude_patterns'),
-                int(job_data.get('retention_count', 0)),
-                int(job_data.get('retention_days', 0)),
-                int(job_data.get('enabled', 1)),
-                int(job_data.get('retry_on_failure', 1)),
-                job_data.get('pre_script'),
-                job_data.get('post_script'),
-                int(job_data.get('verify_checksum', 0))
-            ))
+            self._jobs_changed()
+            cursor = conn.execute(self.SQL_CREATE_JOB, self._job_values(job_data))
             return cursor.lastrowid
     
     def update_job(self, job_id, job_data):
         logger.info(f"[Database] Updating job ID: {job_id}")
         with self._conn() as conn:
-            conn.execute('''
-                UPDATE backup_jobs SET
-                    name = ?, job_type = ?, source_path = ?, dest_path = ?,
-                    remote_host = ?, remote_share = ?, remote_mount_point = ?,
-                    remote_user = ?, remote_pass = ?,
-                    mac_address = ?, use_wol = ?, shutdown_after = ?, schedule_type = ?,
-                    schedule_hour = ?, schedule_minute = ?, schedule_day = ?, schedule_cron = ?,
-                    bandwidth_limit = ?, exclude_patterns = ?, retention_count = ?, retention_days = ?,
-                    enabled = ?, retry_on_failure = ?, pre_script = ?, post_script = ?, verify_checksum = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (
-                job_data.get('name'),
-                job_data.get('job_type'),
-                job_data.get('source_path'),
-                job_data.get('dest_path'),
-                job_data.get('remote_host'),
-                job_data.get('remote_share'),
-                job_data.get('remote_mount_point'),
-                job_data.get('remote_user'),
-                job_data.get('remote_pass'),
-                job_data.get('mac_address'),
-                int(job_data.get('use_wol', 0)),
-                int(job_data.get('shutdown_after', 0)),
-                job_data.get('schedule_type'),
-                int(job_data.get('schedule_hour', 0)),
-                int(job_data.get('schedule_minute', 0)),
-                int(job_data.get('schedule_day', 0)),
-                job_data.get('schedule_cron'),
-                int(job_data.get('bandwidth_limit', 0)),
-                job_data.get('exclude_patterns'),
-                int(job_data.get('retention_count', 0)),
-                int(job_data.get('retention_days', 0)),
-                int(job_data.get('enabled', 1)),
-                int(job_data.get('retry_on_failure', 1)),
-                job_data.get('pre_script'),
-                job_data.get('post_script'),
-                int(job_data.get('verify_checksum', 0)),
-                job_id
-            ))
+            self._jobs_changed()
+            values = self._job_values(job_data)
+            values.append(job_id)
+            conn.execute(self.SQL_UPDATE_JOB, values)
     
     def toggle_job(self, job_id, enabled):
         """Toggle job enabled/disabled status"""
         logger.info(f"[Database] Toggling job ID {job_id} to enabled={enabled}")
         with self._conn() as conn:
+            self._jobs_changed()
             conn.execute("UPDATE backup_jobs SET enabled = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", 
                         (int(enabled), job_id))
     
     def reset_retry_count(self, job_id):
         """Reset retry count after successful backup"""
         with self._conn() as conn:
+            self._jobs_changed()
             conn.execute("UPDATE backup_jobs SET retry_count = 0, last_retry_at = NULL WHERE id = ?", (job_id,))
     
     def increment_retry_count(self, job_id):
         """Increment retry count after failed retry"""
         with self._conn() as conn:
+            self._jobs_changed()
             conn.execute("""
                 UPDATE backup_jobs 
                 SET retry_count = retry_count + 1, last_retry_at = CURRENT_TIMESTAMP 
@@ -643,31 +944,63 @@ class Database:
     def delete_job(self, job_id):
         logger.info(f"[Database] Deleting job ID: {job_id}")
         with self._conn() as conn:
+            self._jobs_changed()
             conn.execute("DELETE FROM backup_history WHERE job_id = ?", (job_id,))
             conn.execute("DELETE FROM backup_jobs WHERE id = ?", (job_id,))
     
     # ---- History ----
     
+    SQL_ADD_HISTORY = '''
+        INSERT INTO backup_history (job_id, job_name, status, dry_run, is_retry)
+        VALUES (?, ?, ?, ?, ?)
+    '''
+    
     def add_history(self, job_id, job_name, status, dry_run=False, is_retry=False):
         with self._conn() as conn:
-            cursor = conn.execute('''
-                INSERT INTO backup_history (job_id, job_name, status, dry_run, is_retry)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (job_id, job_name, status, 1 if dry_run else 0, 1 if is_retry else 0))
+            cursor = conn.execute(self.SQL_ADD_HISTORY,
+                                  (job_id, job_name, status, 1 if dry_run else 0, 1 if is_retry else 0))
             return cursor.lastrowid
     
+    SQL_UPDATE_HISTORY = '''
+        UPDATE backup_history SET
+            status = ?, finished_at = CURRENT_TIMESTAMP,
+            bytes_transferred = ?, files_transferred = ?,
+            duration_seconds = ?, transfer_speed_mbps = ?,
+            error_message = ?
+        WHERE id = ?
+    '''
+    
+    # rsync output lives in its own table so history rows stay narrow
+    SQL_SET_HISTORY_LOG = '''
+        INSERT OR REPLACE INTO backup_history_logs (history_id, log_output) VALUES (?, ?)
+    '''
+    
     def update_history(self, history_id, status, bytes_transferred=0, files_transferred=0,
                        duration_seconds=0, transfer_speed_mbps=0, error_message=None, log_output=None):
         with self._conn() as conn:
-            conn.execute('''
-                UPDATE backup_history SET
-                    status = ?, finished_at = CURRENT_TIMESTAMP,
-                    bytes_transferred = ?, files_transferred = ?,
-                    duration_seconds = ?, transfer_speed_mbps = ?,
-                    error_message = ?, log_output = ?
-                WHERE id = ?
-            ''', (status, bytes_transferred, files_transferred, duration_seconds,
-                  transfer_speed_mbps, error_message, log_output, history_id))
+            conn.execute(self.SQL_UPDATE_HISTORY,
+                         (status, bytes_transferred, files_transferred, duration_seconds,
+                          transfer_speed_mbps, error_message, history_id))
+            if log_output:
+                conn.execute(self.SQL_SET_HISTORY_LOG, (history_id, log_output))
+    
+    def get_history_log(self, history_id):
+        """rsync output for one history entry, or None"""
+        with self._conn() as conn:
+            row = conn.execute("SELECT log_output FROM backup_history_logs WHERE history_id = ?",
+                               (history_id,)).fetchone()
+            return row[0] if row else None
+    
+    def finalize_history(self, history_id, status, bytes_transferred=0, files_transferred=0,
+                         duration_seconds=0, transfer_speed_mbps=0, error_message=None,
+                         log_output=None, count_stats=True):
+        """Complete a history entry and add it to today's statistics in one commit"""
+        with self.transaction():
+            self.update_history(history_id, status, bytes_transferred, files_transferred,
+                                duration_seconds, transfer_speed_mbps, error_message, log_output)
+            if count_stats:
+                self.update_daily_stats(bytes_transferred, files_transferred,
+                                        duration_seconds, status == 'completed')
     
     def get_history(self, limit=100, job_id=None, status=None):
         with self._conn() as conn:
@@ -684,8 +1017,9 @@ class Database:
             query += " ORDER BY started_at DESC LIMIT ?"
             params.append(limit)
             
-            rows = conn.execute(query, params).fetchall()
-            return [dict(row) for row in rows]
+            # Rows are returned as sqlite3.Row (key access, no per-row dict);
+            # _json_default() converts them only when the API serializes them
+            return conn.execute(query, params).fetchall()
     
     def get_last_run(self, job_id):
         with self._conn() as conn:
@@ -696,37 +1030,74 @@ class Database:
             ''', (job_id,)).fetchone()
             return dict(row) if row else None
     
+    # Latest history row of every job in one statement: CROSS JOIN keeps jobs as
+    # the outer loop, so each row is one idx_history_job_id probe plus a rowid
+    # lookup (id order == start order) instead of N separate queries
+    SQL_LAST_RUNS = '''
+        SELECT h.* FROM backup_jobs j
+        CROSS JOIN backup_history h ON h.id = (
+            SELECT id FROM backup_history
+            WHERE job_id = j.id
+            ORDER BY id DESC LIMIT 1
+        )
+    '''
+    
+    def get_last_runs(self):
+        """job_id -> latest history row (as dict) for all jobs that have run"""
+        with self._conn() as conn:
+            return {row['job_id']: dict(row) for row in conn.execute(self.SQL_LAST_RUNS)}
+    
     # ---- Statistics ----
     
+    # excluded.* reuses the inserted values, so each parameter is bound once;
+    # the local date is computed by SQLite rather than per call in Python
+    SQL_UPSERT_DAILY_STATS = '''
+        INSERT INTO daily_stats (date, total_jobs_run, successful_jobs, failed_jobs,
+            total_bytes, total_files, total_duration)
+        VALUES (date('now', 'localtime'), 1, ?, ?, ?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            total_jobs_run = total_jobs_run + 1,
+            successful_jobs = successful_jobs + excluded.successful_jobs,
+            failed_jobs = failed_jobs + excluded.failed_jobs,
+            total_bytes = total_bytes + excluded.total_bytes,
+            total_files = total_files + excluded.total_files,
+            total_duration = total_duration + excluded.total_duration
+    '''
+    
     def update_daily_stats(self, bytes_transferred, files_transferred, duration, success):
-        today = datetime.now().strftime('%Y-%m-%d')
         with self._conn() as conn:
-            conn.execute('''
-                INSERT INTO daily_stats (date, total_jobs_run, successful_jobs, failed_jobs,
-                    total_bytes, total_files, total_duration)
-                VALUES (?, 1, ?, ?, ?, ?, ?)
-                ON CONFLICT(date) DO UPDATE SET
-                    total_jobs_run = total_jobs_run + 1,
-                    successful_jobs = successful_jobs + ?,
-                    failed_jobs = failed_jobs + ?,
-                    total_bytes = total_bytes + ?,
-                    total_files = total_files + ?,
-                    total_duration = total_duration + ?
-            ''', (today, 1 if success else 0, 0 if success else 1, bytes_transferred,
-                  files_transferred, duration,
-                  1 if success else 0, 0 if success else 1, bytes_transferred,
-                  files_transferred, duration))
+            conn.execute(self.SQL_UPSERT_DAILY_STATS,
+                         (1 if success else 0, 0 if success else 1,
+                          bytes_transferred, files_transferred, duration))
     
     def get_stats(self, days=30):
+        # Cutoff in local time, matching the dates written by update_daily_stats
+        cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
         with self._conn() as conn:
             rows = conn.execute('''
                 SELECT * FROM daily_stats 
-                WHERE date >= date('now', ?)
+                WHERE date >= ?
                 ORDER BY date DESC
-            ''', (f'-{days} days',)).fetchall()
+            ''', (cutoff,)).fetchall()
             return [dict(row) for row in rows]
     
+    def get_aggregate_stats(self, days):
+        """(total_runs, successful, failed, total_bytes, total_duration) summed over the last days"""
+        cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        with self._conn() as conn:
+            return tuple(conn.execute('''
+                SELECT
+                    COALESCE(SUM(total_jobs_run), 0),
+                    COALESCE(SUM(successful_jobs), 0),
+                    COALESCE(SUM(failed_jobs), 0),
+                    COALESCE(SUM(total_bytes), 0),
+                    COALESCE(SUM(total_duration), 0)
+                FROM daily_stats
+                WHERE date >= ?
+            ''', (cutoff,)).fetchone())
+    
     def get_totals(self):
+        """Totals over the stored history (what the UI shows - cleared together with it)"""
         with self._conn() as conn:
             row = conn.execute('''
                 SELECT
@@ -747,6 +1118,7 @@ class Database:
         logger.info("[Database] Clearing all backup history")
         with self._conn() as conn:
             conn.execute("DELETE FROM backup_history")
+            conn.execute("PRAGMA incremental_vacuum")
             logger.info("[Database] History cleared")
     
     def reset_statistics(self):
@@ -760,10 +1132,12 @@ class Database:
         """Full database reset - clears history and statistics, keeps jobs"""
         logger.info("[Database] Full database reset starting")
         with self._conn() as conn:
+            self._jobs_changed()
             conn.execute("DELETE FROM backup_history")
             conn.execute("DELETE FROM daily_stats")
             # Reset retry counts on all jobs
             conn.execute("UPDATE backup_jobs SET retry_count = 0, last_retry_at = NULL")
+            conn.execute("PRAGMA incremental_vacuum")
             logger.info("[Database] Full database reset complete")
 
 DB = Database()
@@ -773,25 +1147,40 @@ DB = Database()
 # ============================================
 
 class WakeOnLan:
+    _MAC_STRIP = str.maketrans('', '', ':-.')  # Separators removed from MAC addresses
+    _MAC_HEX = re.compile(r'[0-9a-f]{12}')
+    _sock = None  # Broadcast UDP socket, created on first use and reused
+    
     @staticmethod
-    def send_magic_packet(mac_address, broadcast_ip='255.255.255.255', port=9):
+    @lru_cache(maxsize=32)
+    def _build_packet(mac_hex):
+        """Magic packet: 6 x 0xFF followed by the MAC repeated 16 times"""
+        return b'\xff' * 6 + bytes.fromhex(mac_hex) * 16
+    
+    @classmethod
+    def _get_socket(cls):
+        if cls._sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            cls._sock = sock
+        return cls._sock
+    
+    @classmethod
+    def send_magic_packet(cls, mac_address, broadcast_ip='255.255.255.255', port=9):
         try:
-            mac = mac_address.replace(':', '').replace('-', '').replace('.', '').lower()
+            mac = mac_address.translate(cls._MAC_STRIP).lower()
             if len(mac) != 12:
                 raise ValueError(f"Invalid MAC address: {mac_address}")
             
-            try:
-                int(mac, 16)
-            except ValueError:
+            if not cls._MAC_HEX.fullmatch(mac):
                 raise ValueError(f"Invalid MAC address (not hex): {mac_address}")
             
-            mac_bytes = bytes.fromhex(mac)
-            packet = b'\xff' * 6 + mac_bytes * 16
-            
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            sock.sendto(packet, (broadcast_ip, port))
-            sock.close()
+            try:
+                cls._get_socket().sendto(cls._build_packet(mac), (broadcast_ip, port))
+            except OSError:
+                # Socket may have gone bad (e.g. network restart) - recreate on next send
+                cls._sock = None
+                raise
             
             logger.info(f"[WOL] Sent magic packet to {mac_address}")
             return True, "Magic packet sent"
@@ -800,28 +1189,47 @@ class WakeOnLan:
             return False, str(e)
     
     @staticmethod
-    def wait_for_host(host, timeout=120, interval=5):
+    def wait_for_host(host, timeout=120, interval=5, initial=1.0, factor=1.5, jitter=0.2):
+        """
+        Probe until the host answers. The delay starts at `initial` and grows by
+        `factor` (with +/- `jitter`) up to `interval`, so a quick wake is noticed
+        early without probing a machine still in POST every second.
+        """
         logger.info(f"[WOL] Waiting for {host} to come online (timeout: {timeout}s)")
-        start = time.time()
-        while time.time() - start < timeout:
+        start = time.monotonic()
+        deadline = start + timeout
+        delay = min(initial, interval)
+        while time.monotonic() < deadline:
             if WakeOnLan.ping(host):
-                elapsed = int(time.time() - start)
+                elapsed = int(time.monotonic() - start)
                 logger.info(f"[WOL] {host} is online after {elapsed}s")
                 return True, elapsed
-            time.sleep(interval)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay * (1 + random.uniform(-jitter, jitter)), remaining))
+            delay = min(delay * factor, interval)
         logger.warning(f"[WOL] Timeout waiting for {host}")
         return False, timeout
     
-    @staticmethod
-    def ping(host, timeout=2):
-        try:
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', str(timeout), host],
-                capture_output=True, timeout=timeout+2
-            )
-            return result.returncode == 0
-        except:
-            return False
+    PROBE_PORTS = (445, 139, 22)  # SMB, NetBIOS, SSH
+    
+    @classmethod
+    def ping(cls, host, timeout=2):
+        """TCP connect probe - no fork, and a refused connection still means the host is up"""
+        for port in cls.PROBE_PORTS:
+            try:
+                with socket.create_connection((host, port), timeout=timeout):
+                    return True
+            except ConnectionRefusedError:
+                return True
+            except socket.timeout:
+                # Filtered port on a live host looks the same as a dead host - try the next one
+                continue
+            except OSError:
+                # Unreachable / name resolution failure
+                return False
+        return False
 
 # ============================================
 # REMOTE SHUTDOWN
@@ -868,14 +1276,23 @@ class MountManager:
         '/usr/local/sbin/rc.unassigned',
         '/var/local/overlay/usr/local/sbin/rc.unassigned'
     ]
+    _rc_path = None  # Resolved on first successful lookup, cleared by refresh()
     
     @classmethod
     def get_rc_path(cls):
+        if cls._rc_path is not None:
+            return cls._rc_path
+        # Not cached while missing, so installing UD later is picked up
         for path in cls.RC_PATHS:
             if os.path.exists(path) and os.access(path, os.X_OK):
+                cls._rc_path = path
                 return path
         return None
     
+    @classmethod
+    def refresh(cls):
+        cls._rc_path = None
+    
     @classmethod
     def is_ud_available(cls):
         return cls.get_rc_path() is not None
@@ -935,18 +1352,27 @@ class MountManager:
     @classmethod
     def is_mounted(cls, mount_point):
         try:
-            result = subprocess.run(
-                ['mountpoint', '-q', mount_point],
-                capture_output=True, timeout=5
-            )
-            return result.returncode == 0
-        except:
+            return os.path.ismount(mount_point)
+        except OSError:
             return False
+    
+    @classmethod
+    def wait_for_mount(cls, mount_point, timeout=10, interval=1):
+        """Poll until mount_point is mounted - returns as soon as it appears instead of sleeping the full timeout"""
+        deadline = time.monotonic() + timeout
+        while not cls.is_mounted(mount_point):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+        return True
 
 # ============================================
 # NOTIFICATION MANAGER
 # ============================================
 
+_BYTES_PER_GB = 1 << 30
+_SECS_PER_HOUR = 3600
+
 class NotifyManager:
     COLORS = {
         "blue": 3447003,
@@ -956,6 +1382,8 @@ class NotifyManager:
         "grey": 9807270
     }
     
+    _notify_procs = []  # Running Unraid notify script processes
+    
     @classmethod
     def unraid_notify(cls, subject, description, importance="normal"):
         if not Config.C.get("UNRAID_NOTIFICATIONS", True):
@@ -969,176 +1397,327 @@ class NotifyManager:
                 '-d', description,
                 '-i', importance
             ]
-            subprocess.run(cmd, capture_output=True, timeout=10)
-            logger.debug(f"[Notify] Unraid notification sent: {subject}")
+            # Fire and forget - output is discarded anyway, so don't wait on the
+            # script. Finished children are reaped on the next call.
+            cls._notify_procs = [p for p in cls._notify_procs if p.poll() is None]
+            cls._notify_procs.append(_spawn(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ))
+            logger.debug("[Notify] Unraid notification sent: %s", subject)
             return True
         except Exception as e:
             logger.error(f"[Notify] Unraid notification failed - {e}")
             return False
     
+    # Webhook POSTs are handed to a single background worker so callers
+    # (backup engine, scheduler) never wait on the Discord round-trip
+    WEBHOOK_QUEUE_SIZE = 256
+    WEBHOOK_MAX_ATTEMPTS = 5   # Background sends only - inline (wait=True) posts try once
+    WEBHOOK_MAX_BACKOFF = 30   # Seconds
+    _webhook_queue = queue.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+    _webhook_thread = None
+    _webhook_lock = threading.Lock()
+    _ssl_ctx = None
+    _http_conn = None
+    _http_key = None
+    _http_lock = threading.Lock()
+    
+    # Static parts of every webhook post, built once
+    FOOTER = f"ATP Backup v{Config.VERSION}"
+    WEBHOOK_HEADERS = {
+        'Content-Type': 'application/json',
+        'User-Agent': f'AtpBackup/{Config.VERSION}'
+    }
+    _json_encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+    
     @classmethod
-    def discord_notify(cls, title, description, color="blue", fields=None, footer=None):
+    def discord_notify(cls, title, description, color="blue", fields=None, footer=None, wait=False):
+        """
+        Send a Discord embed. Queued for the background worker and returns True
+        immediately, unless wait=True (POST inline and return the real result).
+        """
         url = Config.C.get("DISCORD_WEBHOOK_URL", "")
         if not url:
             logger.debug("[Notify] Discord webhook not configured")
             return True
         
+        return cls._send_embeds(url, [cls._build_embed(title, description, color, fields, footer)],
+                                title, wait)
+    
+    @classmethod
+    def _build_embed(cls, title, description, color="blue", fields=None, footer=None):
+        embed = {
+            "title": title,
+            "description": description,
+            "color": cls.COLORS.get(color, cls.COLORS["grey"]),
+            "footer": {"text": footer or cls.FOOTER},
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        }
+        
+        if fields:
+            embed["fields"] = fields
+        
+        return embed
+    
+    @classmethod
+    def _send_embeds(cls, url, embeds, title, wait=False):
+        """Post up to 10 embeds (Discord's per-message limit) in one webhook call"""
+        payload = {"embeds": embeds}
+        data = orjson.dumps(payload) if orjson else cls._json_encode(payload).encode()
+        
+        if wait:
+            return cls._post_webhook(url, data, title)
+        
+        cls._start_webhook_worker()
+        item = (url, data, title)
         try:
-            import urllib.request
-            import ssl
-            
-            embed = {
-                "title": title,
-                "description": description,
-                "color": cls.COLORS.get(color, cls.COLORS["grey"]),
-                "footer": {"text": footer or f"ATP Backup v{Config.VERSION}"},
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")
-            }
-            
-            if fields:
-                embed["fields"] = fields
-            
-            data = json.dumps({"embeds": [embed]}).encode()
-            
-            req = urllib.request.Request(
-                url,
-                data=data,
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': f'AtpBackup/{Config.VERSION}'
-                }
-            )
-            
+            cls._webhook_queue.put_nowait(item)
+        except queue.Full:
+            # Drop the oldest pending notification rather than grow without bound
+            try:
+                dropped = cls._webhook_queue.get_nowait()
+                cls._webhook_queue.task_done()
+                logger.warning(f"[Notify] Webhook queue full, dropped: {dropped[2]}")
+            except queue.Empty:
+                pass
+            try:
+                cls._webhook_queue.put_nowait(item)
+            except queue.Full:
+                logger.warning(f"[Notify] Webhook queue full, dropped: {title}")
+        return True
+    
+    @classmethod
+    def _post_webhook(cls, url, data, title, max_attempts=1):
+        """
+        POST a webhook payload. Rate limits (429, honouring Retry-After), 5xx and
+        network errors are retried with backoff up to max_attempts; other 4xx
+        responses are not retryable.
+        """
+        for attempt in range(1, max_attempts + 1):
+            delay = min(2 ** attempt, cls.WEBHOOK_MAX_BACKOFF)
+            try:
+                status, reason, retry_after = cls._webhook_request(url, data)
+            except Exception as e:
+                error = str(e)
+            else:
+                if status < 400:
+                    logger.info(f"[Notify] Discord notification sent: {title}")
+                    return True
+                error = f"HTTP Error {status}: {reason}"
+                if status == 429:
+                    if retry_after is not None:
+                        delay = min(retry_after, cls.WEBHOOK_MAX_BACKOFF)
+                elif status < 500:
+                    break
+            
+            if attempt < max_attempts:
+                logger.warning(f"[Notify] Discord notification failed ({error}), retrying in {delay:g}s")
+                time.sleep(delay)
+        
+        logger.error(f"[Notify] Discord notification failed - {error}")
+        return False
+    
+    @classmethod
+    def _webhook_request(cls, url, data):
+        """Single POST over the keep-alive connection. Returns (status, reason, retry_after)"""
+        parsed = urlparse(url)
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        with cls._http_lock:
+            # Keep-alive connection is reused across posts; a stale socket
+            # (server closed it while idle) gets one reconnect + retry
+            for attempt in (1, 2):
+                conn = cls._http_connection(parsed)
+                try:
+                    conn.request('POST', path, body=data, headers=cls.WEBHOOK_HEADERS)
+                    response = conn.getresponse()
+                    response.read()
+                    break
+                except (http.client.HTTPException, OSError):
+                    cls._close_http_connection()
+                    if attempt == 2:
+                        raise
+        
+        try:
+            retry_after = float(response.getheader('Retry-After'))
+        except (TypeError, ValueError):
+            retry_after = None
+        return response.status, response.reason, retry_after
+    
+    @classmethod
+    def _http_connection(cls, parsed):
+        """Persistent connection to the webhook host, reopened if the URL's host changes"""
+        key = (parsed.scheme, parsed.netloc)
+        if cls._http_conn is None or cls._http_key != key:
+            cls._close_http_connection()
+            if parsed.scheme == 'https':
+                cls._http_conn = http.client.HTTPSConnection(parsed.netloc, timeout=10,
+                                                             context=cls._ssl_context())
+            else:
+                cls._http_conn = http.client.HTTPConnection(parsed.netloc, timeout=10)
+            cls._http_key = key
+        return cls._http_conn
+    
+    @classmethod
+    def _close_http_connection(cls):
+        if cls._http_conn is not None:
+            cls._http_conn.close()
+            cls._http_conn = None
+    
+    @classmethod
+    def _ssl_context(cls):
+        """Built once - create_default_context() loads the CA bundle from disk every call"""
+        if cls._ssl_ctx is None:
             ctx = ssl.create_default_context()
             ctx.check_hostname = False
             ctx.verify_mode = ssl.CERT_NONE
-            
-            with urllib.request.urlopen(req, timeout=10, context=ctx) as response:
-                pass
-            
-            logger.info(f"[Notify] Discord notification sent: {title}")
-            return True
-        except Exception as e:
-            logger.error(f"[Notify] Discord notification failed - {e}")
-            return False
+            cls._ssl_ctx = ctx
+        return cls._ssl_ctx
+    
+    @classmethod
+    def _start_webhook_worker(cls):
+        with cls._webhook_lock:
+            if cls._webhook_thread and cls._webhook_thread.is_alive():
+                return
+            cls._webhook_thread = threading.Thread(target=cls._webhook_worker, daemon=True,
+                                                   name="DiscordWebhook")
+            cls._webhook_thread.start()
+    
+    @classmethod
+    def _webhook_worker(cls):
+        while True:
+            url, data, title = cls._webhook_queue.get()
+            try:
+                cls._post_webhook(url, data, title, cls.WEBHOOK_MAX_ATTEMPTS)
+            finally:
+                cls._webhook_queue.task_done()
+    
+    @classmethod
+    def flush_webhooks(cls, timeout=15):
+        """Wait up to timeout seconds for queued notifications to be sent. Returns True if drained."""
+        deadline = time.monotonic() + timeout
+        q = cls._webhook_queue
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                q.all_tasks_done.wait(remaining)
+        return True
     
     @classmethod
     def send_daily_summary(cls):
-        if not Config.C.get("DISCORD_DAILY_SUMMARY", False):
-            return
-
-        url = Config.C.get("DISCORD_WEBHOOK_URL", "")
-        if not url:
-            return
-
-        today = datetime.now().strftime('%Y-%m-%d')
-        stats = DB.get_stats(1)
-
-        if not stats:
-            return
-
-        stat = stats[0]
-        total = stat.get('total_jobs_run', 0)
-        success = stat.get('successful_jobs', 0)
-        failed = stat.get('failed_jobs', 0)
-        total_bytes = stat.get('total_bytes', 0)
-
-        gb = total_bytes / (1024**3) if total_bytes else 0
-
-        color = "green" if failed == 0 else ("orange" if success > 0 else "red")
-
-        cls.discord_notify(
-            f"📊 Daily Summary - {today}",
-            f"Total jobs: {total}\nSuccessful: {success}\nFailed: {failed}",
-            color,
-            [
-                {"name": "Data Transferred", "value": f"{gb:.2f} GB", "inline": True},
-                {"name": "Success Rate", "value": f"{(success/max(total,1))*100:.0f}%", "inline": True}
-            ]
-        )
+        cls.send_summaries(('daily',))
 
     @classmethod
     def send_weekly_summary(cls):
         """Send weekly summary report"""
-        if not Config.C.get("DISCORD_WEEKLY_SUMMARY", False):
-            return
+        cls.send_summaries(('weekly',))
 
-        url = Config.C.get("DISCORD_WEBHOOK_URL", "")
-        if not url:
-            return
+    @classmethod
+    def send_monthly_summary(cls):
+        """Send monthly summary report"""
+        cls.send_summaries(('monthly',))
 
-        stats = DB.get_stats(7)
+    SUMMARY_FLAGS = {
+        'daily': "DISCORD_DAILY_SUMMARY",
+        'weekly': "DISCORD_WEEKLY_SUMMARY",
+        'monthly': "DISCORD_MONTHLY_SUMMARY",
+    }
 
-        if not stats:
+    @classmethod
+    def send_summaries(cls, kinds=('daily', 'weekly', 'monthly')):
+        """Build the requested summaries and post them together in a single webhook message"""
+        url, kinds = cls._summary_gate(kinds)
+        if not kinds:
             return
 
-        # Aggregate weekly stats
-        total = sum(s.get('total_jobs_run', 0) for s in stats)
-        success = sum(s.get('successful_jobs', 0) for s in stats)
-        failed = sum(s.get('failed_jobs', 0) for s in stats)
-        total_bytes = sum(s.get('total_bytes', 0) for s in stats)
-        total_duration = sum(s.get('total_duration', 0) for s in stats)
+        builders = {
+            'daily': cls._daily_summary_embed,
+            'weekly': cls._weekly_summary_embed,
+            'monthly': cls._monthly_summary_embed,
+        }
+        # One clock read so every report in the batch agrees on the date boundaries
+        now = datetime.now()
+        embeds = [embed for embed in (builders[kind](now) for kind in kinds) if embed]
+        if not embeds:
+            return
 
-        gb = total_bytes / (1024**3) if total_bytes else 0
-        hours = total_duration / 3600 if total_duration else 0
+        cls._send_embeds(url, embeds, ", ".join(embed["title"] for embed in embeds))
+        logger.info(f"[Notify] Queued {len(embeds)} summary report(s)")
 
-        color = "green" if failed == 0 else ("orange" if success > 0 else "red")
+    @classmethod
+    def _summary_gate(cls, kinds):
+        """(webhook url, enabled kinds) - kinds is empty when none are enabled or no webhook is set"""
+        C = Config.C
+        url = C.get("DISCORD_WEBHOOK_URL", "")
+        if not url:
+            return url, []
+        return url, [kind for kind in kinds if C.get(cls.SUMMARY_FLAGS[kind], False)]
 
-        week_start = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        week_end = datetime.now().strftime('%Y-%m-%d')
+    @staticmethod
+    def _summary_color(success, failed):
+        return "green" if failed == 0 else ("orange" if success > 0 else "red")
 
-        cls.discord_notify(
-            f"📈 Weekly Summary ({week_start} to {week_end})",
-            f"Total jobs: {total}\nSuccessful: {success}\nFailed: {failed}",
-            color,
-            [
-                {"name": "Data Transferred", "value": f"{gb:.2f} GB", "inline": True},
-                {"name": "Success Rate", "value": f"{(success/max(total,1))*100:.0f}%", "inline": True},
-                {"name": "Total Duration", "value": f"{hours:.1f} hours", "inline": True}
-            ]
-        )
-        logger.info("[Notify] Weekly summary sent")
+    @staticmethod
+    def _build_fields(gb, success_rate, hours=None):
+        """Embed fields shared by the summary reports"""
+        fields = [
+            {"name": "Data Transferred", "value": f"{gb:.2f} GB", "inline": True},
+            {"name": "Success Rate", "value": f"{success_rate:.0f}%", "inline": True}
+        ]
+        if hours is not None:
+            fields.append({"name": "Total Duration", "value": f"{hours:.1f} hours", "inline": True})
+        return fields
+
+    # One C-level lookup for all counters of a daily_stats row
+    _daily_counters = itemgetter('total_jobs_run', 'successful_jobs', 'failed_jobs', 'total_bytes')
 
     @classmethod
-    def send_monthly_summary(cls):
-        """Send monthly summary report"""
-        if not Config.C.get("DISCORD_MONTHLY_SUMMARY", False):
-            return
+    def _daily_summary_embed(cls, now):
+        today = now.strftime('%Y-%m-%d')
+        stats = DB.get_stats(1)
 
-        url = Config.C.get("DISCORD_WEBHOOK_URL", "")
-        if not url:
-            return
+        if not stats:
+            return None
 
-        stats = DB.get_stats(30)
+        total, success, failed, total_bytes = cls._daily_counters(stats[0])
 
-        if not stats:
-            return
+        gb = total_bytes / _BYTES_PER_GB
 
-        # Aggregate monthly stats
-        total = sum(s.get('total_jobs_run', 0) for s in stats)
-        success = sum(s.get('successful_jobs', 0) for s in stats)
-        failed = sum(s.get('failed_jobs', 0) for s in stats)
-        total_bytes = sum(s.get('total_bytes', 0) for s in stats)
-        total_duration = sum(s.get('total_duration', 0) for s in stats)
+        return cls._build_embed(
+            f"📊 Daily Summary - {today}",
+            f"Total jobs: {total}\nSuccessful: {success}\nFailed: {failed}",
+            cls._summary_color(success, failed),
+            cls._build_fields(gb, success / max(total, 1) * 100)
+        )
 
-        gb = total_bytes / (1024**3) if total_bytes else 0
-        hours = total_duration / 3600 if total_duration else 0
+    @classmethod
+    def _period_summary_embed(cls, title, days):
+        total, success, failed, total_bytes, total_duration = DB.get_aggregate_stats(days)
 
-        color = "green" if failed == 0 else ("orange" if success > 0 else "red")
+        if not total:
+            return None
 
-        month_name = datetime.now().strftime('%B %Y')
+        gb = total_bytes / _BYTES_PER_GB
+        hours = total_duration / _SECS_PER_HOUR
 
-        cls.discord_notify(
-            f"📊 Monthly Summary - {month_name}",
+        return cls._build_embed(
+            title,
             f"Total jobs: {total}\nSuccessful: {success}\nFailed: {failed}",
-            color,
-            [
-                {"name": "Data Transferred", "value": f"{gb:.2f} GB", "inline": True},
-                {"name": "Success Rate", "value": f"{(success/max(total,1))*100:.0f}%", "inline": True},
-                {"name": "Total Duration", "value": f"{hours:.1f} hours", "inline": True}
-            ]
+            cls._summary_color(success, failed),
+            cls._build_fields(gb, success / max(total, 1) * 100, hours)
         )
-        logger.info("[Notify] Monthly summary sent")
+
+    @classmethod
+    def _weekly_summary_embed(cls, now):
+        week_start = (now - timedelta(days=7)).strftime('%Y-%m-%d')
+        week_end = now.strftime('%Y-%m-%d')
+        return cls._period_summary_embed(f"📈 Weekly Summary ({week_start} to {week_end})", 7)
+
+    @classmethod
+    def _monthly_summary_embed(cls, now):
+        month_name = now.strftime('%B %Y')
+        return cls._period_summary_embed(f"📊 Monthly Summary - {month_name}", 30)
 
 # ============================================
 # BACKUP ENGINE
@@ -1151,49 +1730,93 @@ class BackupEngine:
     abort_flag = False
     _lock = threading.Lock()
     
+    # rsync --stats summary: (lowercased line prefix, stats key)
+    _RSYNC_STATS = (
+        ('total transferred file size:', 'transferred'),  # Best metric for actual backup size
+        ('total file size:', 'total_file'),
+        ('literal data:', 'literal'),
+        ('total bytes sent:', 'sent'),
+        ('total bytes received:', 'received'),
+        ('number of regular files transferred:', 'regular_files'),
+        ('number of files transferred:', 'all_files'),  # Older rsync
+    )
+    _RSYNC_STAT_STARTS = ('Total ', 'Literal data', 'Number of ', 'sent ')
+    _RE_STAT_NUMBER = re.compile(r'([\d,\.\s]+)')
+    _RE_SENT = re.compile(r'sent\s+([\d,\.\s]+)\s*bytes', re.IGNORECASE)
+    _RE_PROGRESS = re.compile(r'([\d,\.]+)\s*([KMGTkmgt]?)\s+100%')
+    # --info=progress2: "  1,234,567  12%   45.67MB/s    0:01:23 (xfr#5, ir-chk=1000/2000)"
+    # (running totals for the whole transfer, not one line per file)
+    _RE_PROGRESS2 = re.compile(r'([\d,\.]+)\s*([KMGTkmgt]?)\s+\d+%.*\(xfr#(\d+)')
+    # --progress size suffix -> byte multiplier (both cases, so no .upper() per line)
+    _SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40,
+                   'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+    
+    # _lock only guards the start/finish transition in run_job. Status reads are
+    # lock-free: current_job is published with a single assignment, and
+    # current_progress is never mutated in place - _set_progress swaps in a new
+    # dict - so a reader always sees a consistent snapshot.
+    
     @classmethod
     def is_running(cls):
-        with cls._lock:
-            return cls.current_job is not None
+        return cls.current_job is not None
     
     @classmethod
     def get_status(cls):
-        with cls._lock:
-            if cls.current_job:
-                return {
-                    'running': True,
-                    'job_id': cls.current_job.get('id'),
-                    'job_name': cls.current_job.get('name'),
-                    'progress': cls.current_progress.copy()
-                }
-            return {'running': False}
+        job = cls.current_job
+        if job:
+            return {
+                'running': True,
+                'job_id': job.get('id'),
+                'job_name': job.get('name'),
+                'progress': cls.current_progress
+            }
+        return {'running': False}
+    
+    @classmethod
+    def _set_progress(cls, **changes):
+        cls.current_progress = {**cls.current_progress, **changes}
     
     @classmethod
     def abort(cls):
         cls.abort_flag = True
         logger.warning("[BackupEngine] Abort requested")
     
-    @staticmethod
-    def _format_size(bytes_val):
+    # Deletes every non-digit character - thousand separators and padding
+    _DIGITS_ONLY = str.maketrans('', '', ''.join(chr(c) for c in range(256) if not chr(c).isdigit()))
+    
+    @classmethod
+    def _parse_bytes(cls, s):
+        """Parse bytes from rsync output, handling various formats.
+
+        Rsync output formats:
+        - "Total transferred file size: 8,710,422,528 bytes"
+        - "Total transferred file size: 8.710.422.528 bytes" (some locales)
+        - "Literal data: 8710422528 bytes"
+
+        Rsync always outputs whole numbers for bytes, never decimals.
+        """
+        try:
+            return int(s.translate(cls._DIGITS_ONLY) or 0)
+        except ValueError:
+            return 0
+    
+    # (divisor, format) per 1024 step; the index comes from the value's bit length
+    _SIZE_UNITS_FMT = ((1, "{:.0f} B"), (1 << 10, "{:.1f} KB"), (1 << 20, "{:.2f} MB"), (1 << 30, "{:.2f} GB"))
+    _SPEED_UNITS_FMT = ((1, "{:.0f} B/s"), (1 << 10, "{:.1f} KB/s"), (1 << 20, "{:.1f} MB/s"))
+    
+    @classmethod
+    def _format_size(cls, bytes_val):
         """Format bytes to human readable string"""
-        if bytes_val < 1024:
-            return f"{bytes_val} B"
-        elif bytes_val < 1024 * 1024:
-            return f"{bytes_val / 1024:.1f} KB"
-        elif bytes_val < 1024 * 1024 * 1024:
-            return f"{bytes_val / (1024 * 1024):.2f} MB"
-        else:
-            return f"{bytes_val / (1024 * 1024 * 1024):.2f} GB"
+        units = cls._SIZE_UNITS_FMT
+        div, fmt = units[min(max(int(bytes_val).bit_length() - 1, 0) // 10, len(units) - 1)]
+        return fmt.format(bytes_val / div)
     
-    @staticmethod
-    def _format_speed(bytes_per_sec):
+    @classmethod
+    def _format_speed(cls, bytes_per_sec):
         """Format speed to human readable string"""
-        if bytes_per_sec < 1024:
-            return f"{bytes_per_sec:.0f} B/s"
-        elif bytes_per_sec < 1024 * 1024:
-            return f"{bytes_per_sec / 1024:.1f} KB/s"
-        else:
-            return f"{bytes_per_sec / (1024 * 1024):.1f} MB/s"
+        units = cls._SPEED_UNITS_FMT
+        div, fmt = units[min(max(int(bytes_per_sec).bit_length() - 1, 0) // 10, len(units) - 1)]
+        return fmt.format(bytes_per_sec / div)
     
     @classmethod
     def _run_script(cls, script_path, script_type):
@@ -1245,9 +1868,23 @@ class BackupEngine:
             cls.current_progress = {'phase': 'starting', 'percent': 0}
             cls.abort_flag = False
         
+        try:
+            return cls._execute_job(job, dry_run, is_retry)
+        finally:
+            # Always release the slot, or an unexpected error would block every later backup
+            with cls._lock:
+                cls.current_job = None
+                cls.current_history_id = None
+                cls.current_progress = {}
+    
+    @classmethod
+    def _execute_job(cls, job, dry_run, is_retry):
+        """Body of run_job - runs with the job slot held"""
         job_id = job['id']
         job_name = job['name']
         job_type = job['job_type']
+        # One settings snapshot for the whole job (also immune to mid-run saves)
+        S = Config.S
         
         logger.info("=" * 60)
         logger.info(f"[BackupEngine] Starting job: {job_name}")
@@ -1260,7 +1897,7 @@ class BackupEngine:
         retry_text = " (Retry)" if is_retry else ""
         
         # Notify start if enabled
-        if Config.C.get("DISCORD_NOTIFY_START", True):
+        if S.discord_notify_start:
             NotifyManager.discord_notify(
                 f"🔄 Backup Started{retry_text}: {job_name}",
                 f"Type: {job_type}\nDry run: {'Yes' if dry_run else 'No'}",
@@ -1274,25 +1911,32 @@ class BackupEngine:
         log_output = ""
         success = False
         
+        wake = None  # Future of the host wake-up when it overlaps the pre-script
         try:
             # Run pre-backup script if configured
             pre_script = job.get('pre_script')
             if pre_script and not dry_run:
-                cls.current_progress['phase'] = 'pre-script'
+                if job_type == 'remote_smb_wol':
+                    # Waking the host is mostly waiting - overlap it with the script
+                    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="WakeHost")
+                    wake = pool.submit(cls._wake_host, job)
+                    pool.shutdown(wait=False)
+                cls._set_progress(phase='pre-script')
                 script_ok, script_error = cls._run_script(pre_script, 'pre-backup')
                 if not script_ok:
                     error_message = f"Pre-backup script failed: {script_error}"
                     logger.error(f"[BackupEngine] {error_message}")
                     raise Exception(error_message)
             
-            cls.current_progress['phase'] = 'running'
+            cls._set_progress(phase='running')
             
             if job_type == 'local':
                 success, bytes_transferred, files_transferred, error_message, log_output = cls._run_local(job, dry_run)
             elif job_type == 'remote_smb':
                 success, bytes_transferred, files_transferred, error_message, log_output = cls._run_remote_smb(job, dry_run)
             elif job_type == 'remote_smb_wol':
-                success, bytes_transferred, files_transferred, error_message, log_output = cls._run_remote_smb_wol(job, dry_run)
+                pending, wake = wake, None  # _run_remote_smb_wol owns the wake-up from here
+                success, bytes_transferred, files_transferred, error_message, log_output = cls._run_remote_smb_wol(job, dry_run, pending)
             else:
                 error_message = f"Unknown job type: {job_type}"
                 logger.error(f"[BackupEngine] {error_message}")
@@ -1300,7 +1944,7 @@ class BackupEngine:
             # Run post-backup script if configured and backup succeeded
             post_script = job.get('post_script')
             if post_script and not dry_run and success:
-                cls.current_progress['phase'] = 'post-script'
+                cls._set_progress(phase='post-script')
                 script_ok, script_error = cls._run_script(post_script, 'post-backup')
                 if not script_ok:
                     logger.warning(f"[BackupEngine] Post-backup script failed: {script_error}")
@@ -1309,6 +1953,11 @@ class BackupEngine:
         except Exception as e:
             error_message = str(e)
             logger.exception(f"[BackupEngine] Exception in job '{job_name}'")
+        finally:
+            if wake is not None:
+                # The backup never took over the wake-up (pre-script failed): let it
+                # finish before the job ends and power the host back down if we woke it
+                cls._settle_wake(job, wake)
         
         duration = int(time.time() - start_time)
         
@@ -1316,19 +1965,20 @@ class BackupEngine:
         speed_bytes_per_sec = bytes_transferred / max(duration, 1)
         
         status = 'completed' if success else 'failed'
-        DB.update_history(
-            history_id, status, bytes_transferred, files_transferred,
-            duration, speed_bytes_per_sec, error_message, log_output
-        )
         
-        if not dry_run:
-            DB.update_daily_stats(bytes_transferred, files_transferred, duration, success)
-        
-        # Handle retry logic
-        if success:
-            DB.reset_retry_count(job_id)
-        elif not dry_run and job.get('retry_on_failure', 1):
-            DB.increment_retry_count(job_id)
+        # Write history, statistics and retry state in one commit
+        with DB.transaction():
+            DB.finalize_history(
+                history_id, status, bytes_transferred, files_transferred,
+                duration, speed_bytes_per_sec, error_message, log_output,
+                count_stats=not dry_run
+            )
+            
+            # Handle retry logic
+            if success:
+                DB.reset_retry_count(job_id)
+            elif not dry_run and job.get('retry_on_failure', 1):
+                DB.increment_retry_count(job_id)
         
         # Format size and speed for logging and notifications
         size_str = cls._format_size(bytes_transferred)
@@ -1338,7 +1988,7 @@ class BackupEngine:
             logger.info(f"[BackupEngine] Job completed: {size_str} in {duration}s ({speed_str})")
             
             # Notify success if enabled
-            if Config.C.get("DISCORD_NOTIFY_SUCCESS", True):
+            if S.discord_notify_success:
                 NotifyManager.discord_notify(
                     f"✅ Backup Completed{retry_text}: {job_name}",
                     f"Duration: {duration}s\nTransferred: {size_str}" + (" (dry run)" if dry_run else ""),
@@ -1352,15 +2002,15 @@ class BackupEngine:
         else:
             logger.error(f"[BackupEngine] Job failed: {error_message}")
             retry_info = ""
-            if job.get('retry_on_failure', 1) and Config.C.get("RETRY_ON_FAILURE", True):
+            if job.get('retry_on_failure', 1) and S.retry_on_failure:
                 retry_count = int(job.get('retry_count', 0) or 0) + 1
-                max_retries = int(Config.C.get("RETRY_MAX_ATTEMPTS", 3) or 3)
+                max_retries = int(S.retry_max_attempts or 3)
                 if retry_count < max_retries:
-                    retry_interval = int(Config.C.get('RETRY_INTERVAL_MINUTES', 60) or 60)
+                    retry_interval = int(S.retry_interval_minutes or 60)
                     retry_info = f"\n\n🔁 Will retry in {retry_interval} minutes ({retry_count}/{max_retries})"
             
             # Notify failure if enabled
-            if Config.C.get("DISCORD_NOTIFY_FAILURE", True):
+            if S.discord_notify_failure:
                 NotifyManager.discord_notify(
                     f"❌ Backup Failed{retry_text}: {job_name}",
                     f"Error: {error_message or 'Unknown error'}{retry_info}",
@@ -1368,17 +2018,19 @@ class BackupEngine:
                 )
             NotifyManager.unraid_notify(f"Backup FAILED: {job_name}", error_message or "Unknown error", "alert")
         
-        with cls._lock:
-            cls.current_job = None
-            cls.current_history_id = None
-            cls.current_progress = {}
-        
         logger.info("=" * 60)
         logger.info(f"[BackupEngine] Job finished: {job_name} - {status}")
         logger.info("=" * 60)
         
         return success, error_message
     
+    @staticmethod
+    def _ensure_dir(path):
+        """Create path if missing - a single stat when it already exists (the usual case),
+        where makedirs(exist_ok=True) would stat the parent, attempt mkdir and stat again"""
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+    
     @classmethod
     def _run_local(cls, job, dry_run):
         source = job.get('source_path', '')
@@ -1392,7 +2044,7 @@ class BackupEngine:
         if not os.path.exists(source):
             return False, 0, 0, f"Source path does not exist: {source}", ""
         
-        os.makedirs(dest, exist_ok=True)
+        cls._ensure_dir(dest)
         
         return cls._run_rsync(source, dest, job, dry_run)
     
@@ -1419,102 +2071,146 @@ class BackupEngine:
         was_mounted = MountManager.is_mounted(mount_point)
         
         if not was_mounted:
-            cls.current_progress['phase'] = 'mounting'
+            cls._set_progress(phase='mounting')
             success, msg = MountManager.mount(remote_share)
             if not success:
                 return False, 0, 0, f"Failed to mount remote share: {msg}", ""
             
-            time.sleep(Config.C.get('SMB_SETTLE_TIME', 10))
-            
-            if not MountManager.is_mounted(mount_point):
+            if not MountManager.wait_for_mount(mount_point, Config.S.smb_settle_time):
                 return False, 0, 0, "Mount point not available after mount command", ""
         
         dest = os.path.join(mount_point, dest_subdir) if dest_subdir else mount_point
-        os.makedirs(dest, exist_ok=True)
+        cls._ensure_dir(dest)
         
-        cls.current_progress['phase'] = 'transferring'
+        cls._set_progress(phase='transferring')
         
         try:
             return cls._run_rsync(source, dest, job, dry_run)
         finally:
             if not was_mounted:
-                cls.current_progress['phase'] = 'unmounting'
+                cls._set_progress(phase='unmounting')
                 MountManager.unmount(remote_share)
     
     @classmethod
-    def _run_remote_smb_wol(cls, job, dry_run):
+    def _wake_host(cls, job):
+        """
+        Make sure the job's remote host is up, waking it with WOL if needed.
+        Returns (host_was_online, error); error is None once the host is reachable.
+        """
         host = job.get('remote_host', '')
         mac = job.get('mac_address', '')
         
         if not host:
-            return False, 0, 0, "Remote host not configured", ""
+            return False, "Remote host not configured"
         
-        cls.current_progress['phase'] = 'checking host'
+        cls._set_progress(phase='checking host')
         host_was_online = WakeOnLan.ping(host)
         logger.info(f"[BackupEngine] Host {host} online: {host_was_online}")
         
         if not host_was_online:
             if not mac:
-                return False, 0, 0, "Host offline and no MAC address configured for WOL", ""
+                return False, "Host offline and no MAC address configured for WOL"
             
-            cls.current_progress['phase'] = 'sending WOL'
+            cls._set_progress(phase='sending WOL')
             success, msg = WakeOnLan.send_magic_packet(mac)
             if not success:
-                return False, 0, 0, f"Failed to send WOL packet: {msg}", ""
+                return False, f"Failed to send WOL packet: {msg}"
             
-            cls.current_progress['phase'] = 'waiting for host'
-            timeout = Config.C.get("WOL_WAIT_TIMEOUT", 120)
-            interval = Config.C.get("WOL_PING_INTERVAL", 5)
-            online, elapsed = WakeOnLan.wait_for_host(host, timeout, interval)
+            cls._set_progress(phase='waiting for host')
+            S = Config.S
+            timeout = S.wol_wait_timeout
+            online, elapsed = WakeOnLan.wait_for_host(host, timeout, S.wol_ping_interval)
             
             if not online:
-                return False, 0, 0, f"Host did not come online within {timeout}s", ""
+                return False, f"Host did not come online within {timeout}s"
             
-            smb_wait = Config.C.get("SMB_SETTLE_TIME", 10)
+            smb_wait = S.smb_settle_time
             logger.info(f"[BackupEngine] Waiting {smb_wait}s for SMB service...")
             time.sleep(smb_wait)
         
+        return host_was_online, None
+    
+    @classmethod
+    def _run_remote_smb_wol(cls, job, dry_run, wake=None):
+        # wake: Future of a _wake_host() call already started by run_job
+        host_was_online, error = wake.result() if wake else cls._wake_host(job)
+        if error:
+            return False, 0, 0, error, ""
+        
         success, bytes_transferred, files_transferred, error, log_output = cls._run_remote_smb(job, dry_run)
         
-        if success and job.get('shutdown_after') and not host_was_online:
-            user = job.get('remote_user', '')
-            password = job.get('remote_pass', '')
-            
-            if user and password:
-                cls.current_progress['phase'] = 'shutting down remote'
-                logger.info(f"[BackupEngine] Sending shutdown to {host}")
-                shutdown_ok, shutdown_msg = RemoteShutdown.shutdown_windows(host, user, password)
-                if not shutdown_ok:
-                    logger.warning(f"[BackupEngine] Shutdown failed: {shutdown_msg}")
-            else:
-                logger.info("[BackupEngine] Skipping shutdown - credentials not configured")
+        if success:
+            cls._shutdown_remote(job, host_was_online)
         
         return success, bytes_transferred, files_transferred, error, log_output
     
     @classmethod
-    def _run_rsync(cls, source, dest, job, dry_run):
-        cmd = ['rsync']
+    def _settle_wake(cls, job, wake):
+        """Wait for a wake-up the backup never consumed, then undo it if the host was woken"""
+        try:
+            host_was_online, error = wake.result()
+        except Exception as e:
+            logger.warning(f"[BackupEngine] Host wake-up failed: {e}")
+            return
+        if not error:
+            cls._shutdown_remote(job, host_was_online)
+    
+    @classmethod
+    def _shutdown_remote(cls, job, host_was_online):
+        """Shut the remote host down again if this job woke it and asks for shutdown_after"""
+        if not job.get('shutdown_after') or host_was_online:
+            return
         
-        options = Config.C.get("RSYNC_OPTIONS", "-avh --delete --stats")
-        cmd.extend(options.split())
+        host = job.get('remote_host', '')
+        user = job.get('remote_user', '')
+        password = job.get('remote_pass', '')
+        
+        if user and password:
+            cls._set_progress(phase='shutting down remote')
+            logger.info(f"[BackupEngine] Sending shutdown to {host}")
+            shutdown_ok, shutdown_msg = RemoteShutdown.shutdown_windows(host, user, password)
+            if not shutdown_ok:
+                logger.warning(f"[BackupEngine] Shutdown failed: {shutdown_msg}")
+        else:
+            logger.info("[BackupEngine] Skipping shutdown - credentials not configured")
+    
+    @classmethod
+    def _run_rsync(cls, source, dest, job, dry_run):
+        options = Config.RSYNC_ARGS
+        if dry_run:
+            # Nothing is transferred, so there is no per-file progress to report
+            options = [opt for opt in options if opt != '--progress']
+        cmd = ['rsync', *options]
         
         # Get effective bandwidth limit (considers job setting, schedule, and default)
         job_bw = int(job.get('bandwidth_limit', 0) or 0)
-        bw_limit = BandwidthScheduler.get_effective_limit(job_bw)
+        current_minutes = BandwidthScheduler.current_minutes()
+        bw_limit = BandwidthScheduler.get_effective_limit(job_bw, current_minutes)
         if bw_limit > 0:
             cmd.append(f'--bwlimit={bw_limit}')
-            logger.info(f"[BackupEngine] Bandwidth limit: {bw_limit} KB/s ({BandwidthScheduler.get_current_profile()})")
+            logger.info(f"[BackupEngine] Bandwidth limit: {bw_limit} KB/s ({BandwidthScheduler.get_current_profile(current_minutes)})")
 
         # Checksum verification (slower but more accurate)
         if job.get('verify_checksum'):
             cmd.append('--checksum')
             logger.info("[BackupEngine] Checksum verification enabled")
         
+        # Exclude patterns go to a temp file passed as --exclude-from instead of
+        # one argv entry each, so long lists stay small and clear of ARG_MAX
         excludes = job.get('exclude_patterns', '') or ''
-        for pattern in excludes.split('\n'):
-            pattern = pattern.strip()
-            if pattern and not pattern.startswith('#'):
-                cmd.append(f'--exclude={pattern}')
+        patterns = [p for p in map(str.strip, excludes.split('\n')) if p and not p.startswith('#')]
+        exclude_file = None
+        if patterns:
+            try:
+                with tempfile.NamedTemporaryFile('w', prefix='rsync-excl-', suffix='.txt', delete=False) as f:
+                    exclude_file = f.name
+                    f.write('\n'.join(patterns) + '\n')
+            except OSError as e:
+                if exclude_file:
+                    os.unlink(exclude_file)
+                return False, 0, 0, f"Failed to write exclude file: {e}", ""
+            cmd.append(f'--exclude-from={exclude_file}')
+            logger.info(f"[BackupEngine] Excluding {len(patterns)} pattern(s)")
         
         if dry_run:
             cmd.append('--dry-run')
@@ -1522,123 +2218,121 @@ class BackupEngine:
         source = source.rstrip('/') + '/'
         cmd.extend([source, dest])
         
-        logger.info(f"[BackupEngine] Rsync command: {' '.join(cmd)}")
+        logger.info(f"[BackupEngine] Rsync command: {shlex.join(cmd)}")
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=86400)
+            # Stream rsync's output (stderr merged in) and parse it line by line as
+            # it arrives, instead of buffering the whole run and parsing it twice
+            proc = _spawn(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, bufsize=1)
+            timed_out = threading.Event()
+            
+            def kill_on_timeout():
+                timed_out.set()
+                proc.kill()
             
-            output = result.stdout + '\n' + result.stderr
+            timer = threading.Timer(86400, kill_on_timeout)
+            timer.daemon = True
+            timer.start()
+            
+            # Only the tail is kept for log_output - the stats summary is at the end
+            # (LOG_OUTPUT_MAX_LINES, floored so a bad setting cannot drop the stats block)
+            output_lines = deque(maxlen=max(Config.S.log_output_max_lines, 100))
             
             bytes_transferred = 0
             files_transferred = 0
             
-            def parse_bytes(s):
-                """Parse bytes from rsync output, handling various formats.
-
-                Rsync output formats:
-                - "Total transferred file size: 8,710,422,528 bytes"
-                - "Total transferred file size: 8.710.422.528 bytes" (some locales)
-                - "Literal data: 8710422528 bytes"
-                """
-                if not s:
-                    return 0
-                s = s.strip()
-                # Remove thousand separators (comma, period, space)
-                # Rsync always outputs whole numbers for bytes, never decimals
-                digits_only = re.sub(r'[^\d]', '', s)
-                try:
-                    return int(digits_only) if digits_only else 0
-                except:
-                    return 0
-
             # Parse rsync statistics - look for the best indicator of actual file size
-            total_file_size = 0  # "Total file size" - total size of all files in source
-            transferred_size = 0  # "Total transferred file size" - what was actually transferred
-            literal_data = 0  # "Literal data" - actual bytes sent
-            total_bytes_sent = 0  # "Total bytes sent" - includes protocol overhead
-            total_bytes_received = 0  # "Total bytes received" - for pull operations
+            stats = {}  # _RSYNC_STATS key -> value
             progress_bytes_sum = 0  # Sum of file sizes from --progress output
+            progress_files = 0  # Files completed according to --progress output
 
+            debug = logger.isEnabledFor(logging.DEBUG)
+            track_progress = not dry_run  # Dry runs never print (xfr#...) lines
+            # --info=progress2 replaces the per-file lines with one rolling total,
+            # which also keeps the file list out of the output (and the parser)
+            cumulative_progress = track_progress and any(
+                opt.startswith('--info=') and 'progress2' in opt for opt in options)
+            
+            try:
+                for line in proc.stdout:
+                    line = line.rstrip('\n')
+                    output_lines.append(line)
+
+                    # Stats summary lines - one C-level prefix test rejects file list lines
+                    if line.startswith(cls._RSYNC_STAT_STARTS):
+                        line_lower = line.lower()
+                        for prefix, key in cls._RSYNC_STATS:
+                            if line_lower.startswith(prefix):
+                                match = cls._RE_STAT_NUMBER.search(line, len(prefix))
+                                if match:
+                                    stats[key] = cls._parse_bytes(match.group(1))
+                                    logger.info(f"[BackupEngine] Found '{line[:len(prefix) - 1]}': {stats[key]}")
+                                break
+                        else:
+                            # Alternative format: "sent 8,710,422,528 bytes  received 1,234 bytes  123.45 bytes/sec"
+                            sent_match = cls._RE_SENT.match(line)
+                            if sent_match:
+                                sent_val = cls._parse_bytes(sent_match.group(1))
+                                if sent_val > stats.get('sent', 0):
+                                    stats['sent'] = sent_val
+                                    logger.info(f"[BackupEngine] Found 'sent X bytes': {sent_val}")
+
+                    # Parse --info=progress2 output: the latest line carries the running totals
+                    elif cumulative_progress and '(xfr#' in line:
+                        size_match = cls._RE_PROGRESS2.search(line)
+                        if size_match:
+                            try:
+                                size_num, size_unit, xfr = size_match.groups()
+                                progress_bytes_sum = int(float(size_num.replace(',', '')) * cls._SIZE_UNITS[size_unit])
+                                progress_files = int(xfr)
+                                cls._set_progress(bytes_transferred=progress_bytes_sum,
+                                                  files_transferred=progress_files)
+                            except (ValueError, TypeError) as e:
+                                logger.debug("[BackupEngine] Failed to parse progress line: %s... - %s", line[:50], e)
+
+                    # Parse --progress output: "        116.83M 100%   43.96MB/s    0:00:02 (xfr#1, to-chk=113/1032)"
+                    # This shows the actual file size being transferred
+                    # Note: Line may have leading spaces and size can be in bytes, K, M, G, or T
+                    elif track_progress and '(xfr#' in line and '100%' in line:
+                        # Extract size before 100%: "116.83M", "21.97M", "5.06K", "670" (bytes)
+                        size_match = cls._RE_PROGRESS.search(line)
+                        if size_match:
+                            try:
+                                size_num, size_unit = size_match.groups()
+                                file_bytes = int(float(size_num.replace(',', '')) * cls._SIZE_UNITS[size_unit])
+                                progress_bytes_sum += file_bytes
+                                progress_files += 1
+                                # Live totals for the status API
+                                cls._set_progress(bytes_transferred=progress_bytes_sum,
+                                                  files_transferred=progress_files)
+                                if debug:
+                                    logger.debug("[BackupEngine] Progress line: %s%s = %d bytes", size_num, size_unit, file_bytes)
+                            except (ValueError, TypeError) as e:
+                                logger.debug("[BackupEngine] Failed to parse progress line: %s... - %s", line[:50], e)
+                
+                returncode = proc.wait()
+            finally:
+                timer.cancel()
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                proc.stdout.close()
+            
+            if timed_out.is_set():
+                return False, 0, 0, "Rsync timed out after 24 hours", ""
+            
+            output = '\n'.join(output_lines)
+            
+            total_file_size = stats.get('total_file', 0)  # Total size of all files in source
+            transferred_size = stats.get('transferred', 0)  # What was actually transferred
+            literal_data = stats.get('literal', 0)  # Actual bytes sent
+            total_bytes_sent = stats.get('sent', 0)  # Includes protocol overhead
+            total_bytes_received = stats.get('received', 0)  # For pull operations
+            
             # Log raw output for debugging (first 2000 chars)
-            logger.debug(f"[BackupEngine] Raw rsync output (first 2000 chars):\n{output[:2000]}")
-
-            for line in output.split('\n'):
-                line_lower = line.lower().strip()
-                line_stripped = line.strip()
-
-                # Primary: "Total transferred file size:" - best metric for actual backup size
-                if 'total transferred file size:' in line_lower or 'total transferred file size' in line_lower:
-                    # Extract everything after the colon
-                    if ':' in line:
-                        after_colon = line.split(':', 1)[1]
-                        match = re.search(r'([\d,\.\s]+)', after_colon)
-                        if match:
-                            transferred_size = parse_bytes(match.group(1))
-                            logger.info(f"[BackupEngine] Found 'Total transferred file size': {transferred_size}")
-
-                # Secondary: "Total file size:" - total size of source (may differ from transferred)
-                elif 'total file size:' in line_lower and 'transferred' not in line_lower:
-                    if ':' in line:
-                        after_colon = line.split(':', 1)[1]
-                        match = re.search(r'([\d,\.\s]+)', after_colon)
-                        if match:
-                            total_file_size = parse_bytes(match.group(1))
-                            logger.info(f"[BackupEngine] Found 'Total file size': {total_file_size}")
-
-                # Tertiary: "Literal data:" - actual bytes transferred (without compression)
-                elif 'literal data:' in line_lower:
-                    if ':' in line:
-                        after_colon = line.split(':', 1)[1]
-                        match = re.search(r'([\d,\.\s]+)', after_colon)
-                        if match:
-                            literal_data = parse_bytes(match.group(1))
-                            logger.info(f"[BackupEngine] Found 'Literal data': {literal_data}")
-
-                # "Total bytes sent:" - includes protocol overhead
-                elif 'total bytes sent:' in line_lower:
-                    if ':' in line:
-                        after_colon = line.split(':', 1)[1]
-                        match = re.search(r'([\d,\.\s]+)', after_colon)
-                        if match:
-                            total_bytes_sent = parse_bytes(match.group(1))
-                            logger.info(f"[BackupEngine] Found 'Total bytes sent': {total_bytes_sent}")
-
-                # "Total bytes received:" - for pull/receive operations
-                elif 'total bytes received:' in line_lower:
-                    if ':' in line:
-                        after_colon = line.split(':', 1)[1]
-                        match = re.search(r'([\d,\.\s]+)', after_colon)
-                        if match:
-                            total_bytes_received = parse_bytes(match.group(1))
-                            logger.info(f"[BackupEngine] Found 'Total bytes received': {total_bytes_received}")
-
-                # Alternative format: "sent X bytes  received Y bytes" (single line)
-                elif 'sent' in line_lower and 'bytes' in line_lower and 'received' in line_lower:
-                    # Format: "sent 8,710,422,528 bytes  received 1,234 bytes  123.45 bytes/sec"
-                    sent_match = re.search(r'sent\s+([\d,\.\s]+)\s*bytes', line, re.IGNORECASE)
-                    if sent_match:
-                        sent_val = parse_bytes(sent_match.group(1))
-                        if sent_val > total_bytes_sent:
-                            total_bytes_sent = sent_val
-                            logger.info(f"[BackupEngine] Found 'sent X bytes': {total_bytes_sent}")
-
-                # Parse --progress output: "        116.83M 100%   43.96MB/s    0:00:02 (xfr#1, to-chk=113/1032)"
-                # This shows the actual file size being transferred
-                # Note: Line may have leading spaces and size can be in bytes, K, M, G, or T
-                elif '100%' in line and '(xfr#' in line:
-                    # Extract size before 100%: "116.83M", "21.97M", "5.06K", "670" (bytes)
-                    # Pattern: number with optional decimal, optional unit, then 100%
-                    size_match = re.search(r'([\d,\.]+)\s*([KMGT]?)\s+100%', line, re.IGNORECASE)
-                    if size_match:
-                        try:
-                            size_num = float(size_match.group(1).replace(',', ''))
-                            size_unit = size_match.group(2).upper() if size_match.group(2) else ''
-                            multipliers = {'': 1, 'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
-                            file_bytes = int(size_num * multipliers.get(size_unit, 1))
-                            progress_bytes_sum += file_bytes
-                            logger.debug(f"[BackupEngine] Progress line: {size_num}{size_unit} = {file_bytes} bytes")
-                        except (ValueError, TypeError) as e:
-                            logger.debug(f"[BackupEngine] Failed to parse progress line: {line[:50]}... - {e}")
+            if debug:
+                logger.debug("[BackupEngine] Raw rsync output (first 2000 chars):\n%s", output[:2000])
 
             # Log all parsed values for debugging
             logger.info(f"[BackupEngine] Parsed values: transferred={transferred_size}, total_file={total_file_size}, literal={literal_data}, sent={total_bytes_sent}, received={total_bytes_received}, progress_sum={progress_bytes_sum}")
@@ -1661,42 +2355,30 @@ class BackupEngine:
             elif total_bytes_received > 0:
                 bytes_transferred = total_bytes_received
 
-            for line in output.split('\n'):
-                line_lower = line.lower()
-                            
-                # Files transferred
-                if 'number of regular files transferred:' in line_lower:
-                    match = re.search(r'(\d+)', line.split(':')[1] if ':' in line else line)
-                    if match:
-                        try:
-                            files_transferred = int(match.group(1))
-                        except:
-                            pass
-                elif 'number of files transferred:' in line_lower and files_transferred == 0:
-                    match = re.search(r'(\d+)', line.split(':')[1] if ':' in line else line)
-                    if match:
-                        try:
-                            files_transferred = int(match.group(1))
-                        except:
-                            pass
+            # Regular files count wins; the generic count is only a fallback
+            files_transferred = stats.get('regular_files') or stats.get('all_files') or 0
             
             # Log parsed values for debugging
             logger.info(f"[BackupEngine] Parsed stats: {files_transferred} files, {bytes_transferred} bytes")
             
-            if result.returncode == 0:
+            if returncode == 0:
                 return True, bytes_transferred, files_transferred, None, output
             else:
-                if result.returncode in [23, 24]:
-                    logger.warning(f"[BackupEngine] Rsync completed with warnings (exit {result.returncode})")
-                    return True, bytes_transferred, files_transferred, f"Completed with warnings (exit {result.returncode})", output
+                if returncode in [23, 24]:
+                    logger.warning(f"[BackupEngine] Rsync completed with warnings (exit {returncode})")
+                    return True, bytes_transferred, files_transferred, f"Completed with warnings (exit {returncode})", output
                 
-                error = f"Rsync failed with exit code {result.returncode}"
+                error = f"Rsync failed with exit code {returncode}"
                 return False, bytes_transferred, files_transferred, error, output
                 
-        except subprocess.TimeoutExpired:
-            return False, 0, 0, "Rsync timed out after 24 hours", ""
         except Exception as e:
             return False, 0, 0, str(e), ""
+        finally:
+            if exclude_file:
+                try:
+                    os.unlink(exclude_file)
+                except OSError:
+                    pass
 
 # ============================================
 # SCHEDULER
@@ -1707,9 +2389,21 @@ class Scheduler:
     _running = False
     _stopped = False
     _last_run = {}
+    # Enabled jobs indexed by schedule: (weekday, hour, minute) -> [(position, job)]
+    # with None as wildcard, plus (position, job, cron masks) for custom cron jobs;
+    # rebuilt when DB.jobs_version moves
+    _buckets = {}
+    _cron_jobs = []
+    _buckets_version = None
     _summary_sent_today = False
     _weekly_sent_this_week = False
     _monthly_sent_this_month = False
+    _last_optimize = time.monotonic()
+    # Set by kick()/stop() to end the wait for the next minute early
+    _wakeup = threading.Event()
+    
+    # How often the database query planner statistics are refreshed
+    OPTIMIZE_INTERVAL = 8 * 3600
     
     @classmethod
     def start(cls):
@@ -1729,10 +2423,16 @@ class Scheduler:
             return  # Prevent re-entry
         cls._stopped = True
         cls._running = False
+        cls._wakeup.set()
         if cls._thread:
             cls._thread.join(timeout=5)
         logger.info("[Scheduler] Stopped")
     
+    @classmethod
+    def kick(cls):
+        """Re-check schedules now (jobs or settings changed) instead of at the next minute"""
+        cls._wakeup.set()
+    
     @classmethod
     def _run(cls):
         while cls._running:
@@ -1741,78 +2441,134 @@ class Scheduler:
                 cls._check_daily_summary(now)
                 cls._check_jobs(now)
                 cls._check_retries()
+                cls._check_db_maintenance()
             except Exception as e:
                 logger.error(f"[Scheduler] Error in main loop: {e}")
             
-            time.sleep(60)
+            # Schedules have minute resolution: sleep until just past the next
+            # minute boundary (no drift, so no skipped minutes) unless kicked
+            now = datetime.now()
+            cls._wakeup.wait(60.05 - now.second - now.microsecond / 1e6)
+            cls._wakeup.clear()
+    
+    @classmethod
+    def _check_db_maintenance(cls):
+        """Run PRAGMA optimize every OPTIMIZE_INTERVAL seconds"""
+        if time.monotonic() - cls._last_optimize >= cls.OPTIMIZE_INTERVAL:
+            cls._last_optimize = time.monotonic()
+            DB.optimize()
     
     @classmethod
     def _check_daily_summary(cls, now):
-        summary_hour = Config.C.get("DISCORD_SUMMARY_HOUR", 20)
+        # Summaries due in the same minute go out together in one webhook message
+        due = []
+        S = Config.S  # One settings snapshot per tick
+        summary_hour = S.discord_summary_hour
 
         if now.hour == summary_hour and now.minute == 0:
             if not cls._summary_sent_today:
-                NotifyManager.send_daily_summary()
+                due.append('daily')
                 cls._summary_sent_today = True
         elif now.hour != summary_hour:
             cls._summary_sent_today = False
 
         # Check weekly summary
-        weekly_day = int(Config.C.get("DISCORD_WEEKLY_DAY", 0))  # 0=Monday
-        weekly_hour = int(Config.C.get("DISCORD_WEEKLY_HOUR", 9))
+        weekly_day = S.discord_weekly_day  # 0=Monday
+        weekly_hour = S.discord_weekly_hour
 
         if now.weekday() == weekly_day and now.hour == weekly_hour and now.minute == 0:
             if not cls._weekly_sent_this_week:
-                NotifyManager.send_weekly_summary()
+                due.append('weekly')
                 cls._weekly_sent_this_week = True
         elif now.weekday() != weekly_day:
             cls._weekly_sent_this_week = False
 
         # Check monthly summary
-        monthly_day = int(Config.C.get("DISCORD_MONTHLY_DAY", 1))
-        monthly_hour = int(Config.C.get("DISCORD_MONTHLY_HOUR", 9))
+        monthly_day = S.discord_monthly_day
+        monthly_hour = S.discord_monthly_hour
 
         if now.day == monthly_day and now.hour == monthly_hour and now.minute == 0:
             if not cls._monthly_sent_this_month:
-                NotifyManager.send_monthly_summary()
+                due.append('monthly')
                 cls._monthly_sent_this_month = True
         elif now.day != monthly_day:
             cls._monthly_sent_this_month = False
+
+        if due:
+            NotifyManager.send_summaries(due)
     
     @classmethod
     def _check_jobs(cls, now):
         if BackupEngine.is_running():
             return
         
-        jobs = DB.get_enabled_jobs()
-        
-        for job in jobs:
+        buckets, cron_jobs = cls._schedule_index()
+        weekday, hour, minute = now.weekday(), now.hour, now.minute
+        
+        # Only the jobs due this minute: three bucket lookups plus the cron masks
+        due = [
+            *buckets.get((weekday, hour, minute), ()),  # weekly
+            *buckets.get((None, hour, minute), ()),     # daily
+            *buckets.get((None, None, minute), ()),     # hourly
+        ]
+        due.extend((position, job) for position, job, masks in cron_jobs
+                   if cls._cron_matches(masks, now))
+        # Same precedence as before: first due job in enabled-jobs (name) order
+        due.sort(key=itemgetter(0))
+        
+        for _, job in due:
             job_id = job['id']
-            schedule_type = job.get('schedule_type', 'disabled')
             
-            if schedule_type == 'disabled':
+            # A kick can re-check the same minute - start each job once per minute
+            this_minute = now.replace(second=0, microsecond=0)
+            if cls._last_run.get(job_id) == this_minute:
                 continue
             
-            if cls._should_run(job, now):
-                last = cls._last_run.get(job_id)
-                if last and (now - last).total_seconds() < 60:
-                    continue
-                
-                cls._last_run[job_id] = now
-                logger.info(f"[Scheduler] Starting scheduled job: {job['name']}")
+            cls._last_run[job_id] = this_minute
+            logger.info(f"[Scheduler] Starting scheduled job: {job['name']}")
+            
+            thread = threading.Thread(
+                target=BackupEngine.run_job,
+                args=(job.copy(), False, False),
+                name=f"Backup-{job['name']}"
+            )
+            thread.start()
+            break
+    
+    @classmethod
+    def _schedule_index(cls):
+        """(buckets, cron_jobs) for the enabled jobs, rebuilt only after a job change"""
+        version = DB.jobs_version  # Read first: a change during the rebuild forces another
+        if version != cls._buckets_version:
+            buckets = {}
+            cron_jobs = []
+            for position, job in enumerate(DB.get_enabled_jobs()):
+                schedule_type = job.get('schedule_type', 'disabled')
+                hour = job.get('schedule_hour', 0)
+                minute = job.get('schedule_minute', 0)
                 
-                thread = threading.Thread(
-                    target=BackupEngine.run_job,
-                    args=(job, False, False),
-                    name=f"Backup-{job['name']}"
-                )
-                thread.start()
-                break
+                if schedule_type == 'hourly':
+                    key = (None, None, minute)
+                elif schedule_type == 'daily':
+                    key = (None, hour, minute)
+                elif schedule_type == 'weekly':
+                    key = (job.get('schedule_day', 0), hour, minute)
+                elif schedule_type == 'custom':
+                    # Compiled here, so ticks never re-split the expression
+                    masks = cls._compile_cron(job.get('schedule_cron') or '')
+                    if all(masks):  # A field that can never match disables the job
+                        cron_jobs.append((position, job, masks))
+                    continue
+                else:
+                    continue
+                buckets.setdefault(key, []).append((position, job))
+            cls._buckets, cls._cron_jobs, cls._buckets_version = buckets, cron_jobs, version
+        return cls._buckets, cls._cron_jobs
     
     @classmethod
     def _check_retries(cls):
         """Check for failed jobs that need retry"""
-        if not Config.C.get("RETRY_ON_FAILURE", True):
+        if not Config.S.retry_on_failure:
             return
         
         if BackupEngine.is_running():
@@ -1834,403 +2590,510 @@ class Scheduler:
         except Exception as e:
             logger.error(f"[Scheduler] Error checking retries: {e}")
     
-    @classmethod
-    def _should_run(cls, job, now):
-        schedule_type = job.get('schedule_type', 'disabled')
-        hour = job.get('schedule_hour', 0)
-        minute = job.get('schedule_minute', 0)
-        day = job.get('schedule_day', 0)
-        
-        if schedule_type == 'hourly':
-            return now.minute == minute
-        elif schedule_type == 'daily':
-            return now.hour == hour and now.minute == minute
-        elif schedule_type == 'weekly':
-            return now.weekday() == day and now.hour == hour and now.minute == minute
-        elif schedule_type == 'custom':
-            cron = job.get('schedule_cron', '')
-            return cls._match_cron(cron, now)
-        
-        return False
+    # Value range of each cron field: minute, hour, day, month, weekday (0=Monday)
+    _CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
     
-    @classmethod
-    def _match_cron(cls, cron_expr, dt):
-        if not cron_expr:
-            return False
-        
-        try:
-            parts = cron_expr.split()
-            if len(parts) != 5:
-                return False
-            
-            minute, hour, day, month, weekday = parts
-            
-            checks = [
-                (minute, dt.minute),
-                (hour, dt.hour),
-                (day, dt.day),
-                (month, dt.month),
-                (weekday, dt.weekday())
-            ]
-            
-            for pattern, value in checks:
-                if not cls._cron_match(pattern, value):
-                    return False
-            
-            return True
-        except:
-            return False
+    @staticmethod
+    def _cron_field_mask(pattern, lo, hi):
+        """Bitmask of the values in lo..hi matched by one cron field ('*', '*/N', 'a-b', 'a', comma lists)"""
+        mask = 0
+        for part in pattern.split(','):
+            if part == '*':
+                values = range(lo, hi + 1)
+            elif part.startswith('*/'):
+                step = int(part[2:])
+                if step <= 0:
+                    return 0
+                values = range(lo + (-lo) % step, hi + 1, step)
+            elif '-' in part:
+                start, end = part.split('-')
+                values = range(int(start), int(end) + 1)
+            else:
+                values = (int(part),)
+            for v in values:
+                if lo <= v <= hi:
+                    mask |= 1 << v
+        return mask
     
     @classmethod
-    def _cron_match(cls, pattern, value):
-        if pattern == '*':
-            return True
-        
-        if pattern.startswith('*/'):
-            try:
-                step = int(pattern[2:])
-                return value % step == 0
-            except:
-                return False
-        
-        if ',' in pattern:
-            values = [int(v) for v in pattern.split(',')]
-            return value in values
-        
-        if '-' in pattern:
-            try:
-                start, end = pattern.split('-')
-                return int(start) <= value <= int(end)
-            except:
-                return False
-        
+    @lru_cache(maxsize=256)
+    def _compile_cron(cls, cron_expr):
+        """Parse a cron expression once into five field bitmasks (all 0 if invalid)"""
+        parts = cron_expr.split()
+        if len(parts) != 5:
+            return (0, 0, 0, 0, 0)
         try:
-            return value == int(pattern)
-        except:
-            return False
+            return tuple(cls._cron_field_mask(part, lo, hi)
+                         for part, (lo, hi) in zip(parts, cls._CRON_RANGES))
+        except ValueError:
+            return (0, 0, 0, 0, 0)
+    
+    @staticmethod
+    def _cron_matches(masks, dt):
+        """True if dt falls on a set bit in all five compiled cron field masks"""
+        minute, hour, day, month, weekday = masks
+        return bool((minute >> dt.minute) & (hour >> dt.hour) & (day >> dt.day) &
+                    (month >> dt.month) & (weekday >> dt.weekday()) & 1)
 
 # ============================================
 # HTTP API SERVER
 # ============================================
 
+def _tail_lines(path, lines, chunk=1 << 16):
+    """Last `lines` lines of a file, reading backwards in growing chunks instead of the whole file"""
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        if lines <= 0:
+            chunk = size
+        while True:
+            chunk = min(chunk, size)
+            f.seek(size - chunk)
+            data = f.read(chunk)
+            # One newline more than requested guarantees the first kept line is whole
+            if chunk >= size or data.count(b'\n') > lines:
+                break
+            chunk *= 2
+    tail = data.splitlines(keepends=True)
+    if lines > 0:
+        tail = tail[-lines:]
+    return b''.join(tail).decode('utf-8', 'replace')
+
+def _json_default(obj):
+    """json.dumps fallback: serialize sqlite3.Row lazily, everything else as str"""
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    return str(obj)
+
 class APIHandler(BaseHTTPRequestHandler):
+    # Buffer wfile (the default 0 writes straight to the socket): the status
+    # line, headers and a small JSON body then leave in one send() when
+    # handle_one_request() flushes after the do_* method
+    wbufsize = -1
+    
     def log_message(self, format, *args):
-        logger.debug(f"[API] {args[0]}")
+        logger.debug("[API] %s", args[0])
+    
+    # Sent with every response (Content-Length is added per body)
+    JSON_HEADERS = (
+        ('Content-Type', 'application/json'),
+        ('Access-Control-Allow-Origin', '*'),
+        ('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS'),
+        ('Access-Control-Allow-Headers', 'Content-Type'),
+    )
+    
+    # Bodies below this size are sent as-is even if the client accepts gzip
+    GZIP_MIN_SIZE = 1024
     
     def _send_json(self, data, status=200):
+        # orjson produces bytes directly; the stdlib path is the fallback
+        if orjson:
+            body = orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            body = json.dumps(data, default=_json_default).encode()
+        # Large replies (mostly /api/logs) compress well; level 1 keeps it cheap
+        gzipped = (len(body) > self.GZIP_MIN_SIZE and
+                   'gzip' in self.headers.get('Accept-Encoding', ''))
+        if gzipped:
+            body = gzip.compress(body, compresslevel=1)
         self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        for name, value in self.JSON_HEADERS:
+            self.send_header(name, value)
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data, default=str).encode())
+        self.wfile.write(body)
     
     def _read_json(self):
         content_length = int(self.headers.get('Content-Length', 0))
         if content_length > 0:
             body = self.rfile.read(content_length)
-            return json.loads(body.decode())
+            # Both parsers take the raw bytes - no separate decode step
+            return orjson.loads(body) if orjson else json.loads(body)
         return {}
     
     def do_OPTIONS(self):
         self._send_json({'success': True})
     
+    def _route(self, method, path, arg):
+        """Call the handler registered for method + path (exact match first, then patterns)"""
+        handler = self.ROUTES[method].get(path)
+        groups = ()
+        if handler is None:
+            for pattern, pattern_handler in self.PATTERNS[method]:
+                match = pattern.fullmatch(path)
+                if match:
+                    handler, groups = pattern_handler, match.groups()
+                    break
+            else:
+                self._send_json({'success': False, 'error': 'Not found'}, 404)
+                return
+        handler(self, arg, *groups)
+    
     def do_GET(self):
         parsed = urlparse(self.path)
-        path = parsed.path
-        params = parse_qs(parsed.query)
         
         try:
-            if path == '/api/status':
-                uptime = int(time.time() - START_TIME)
-                status = BackupEngine.get_status()
-                self._send_json({
-                    'success': True,
-                    'version': Config.VERSION,
-                    'uptime': uptime,
-                    'ud_available': MountManager.is_ud_available(),
-                    'backup': status
-                })
-            
-            elif path == '/api/jobs':
-                jobs = DB.get_jobs()
-                for job in jobs:
-                    last = DB.get_last_run(job['id'])
-                    job['last_run'] = last
-                self._send_json({'success': True, 'jobs': jobs})
-            
-            elif path.startswith('/api/jobs/') and path.count('/') == 3:
-                job_id = int(path.split('/')[-1])
-                job = DB.get_job(job_id)
-                if job:
-                    job['last_run'] = DB.get_last_run(job_id)
-                    self._send_json({'success': True, 'job': job})
-                else:
-                    self._send_json({'success': False, 'error': 'Job not found'}, 404)
-            
-            elif path == '/api/history':
-                limit = int(params.get('limit', [100])[0])
-                job_id = params.get('job_id', [None])[0]
-                if job_id:
-                    job_id = int(job_id)
-                history = DB.get_history(limit, job_id)
-                self._send_json({'success': True, 'history': history})
-            
-            elif path == '/api/stats':
-                days = int(params.get('days', [30])[0])
-                stats = DB.get_stats(days)
-                totals = DB.get_totals()
-                self._send_json({'success': True, 'stats': stats, 'totals': totals})
-            
-            elif path == '/api/logs':
-                lines = int(params.get('lines', [200])[0])
-                if os.path.exists(LOG_FILE):
-                    with open(LOG_FILE, 'r') as f:
-                        all_lines = f.readlines()
-                        log_content = ''.join(all_lines[-lines:])
-                else:
-                    log_content = "No log file found"
-                self._send_json({'success': True, 'logs': log_content})
-            
-            elif path == '/api/settings':
-                self._send_json({'success': True, 'settings': Config.C})
-
-            elif path == '/api/export/jobs':
-                # Export all jobs as JSON
-                jobs = DB.get_jobs()
-                # Remove sensitive fields for export
-                for job in jobs:
-                    job.pop('remote_pass', None)  # Don't export passwords
-                    job.pop('id', None)  # Remove IDs (will be recreated on import)
-                    job.pop('created_at', None)
-                    job.pop('updated_at', None)
-                    job.pop('retry_count', None)
-                    job.pop('last_retry_at', None)
-                export_data = {
-                    'version': Config.VERSION,
-                    'export_date': datetime.now().isoformat(),
-                    'export_type': 'jobs',
-                    'jobs': jobs
-                }
-                self._send_json({'success': True, 'data': export_data})
-
-            elif path == '/api/export/settings':
-                # Export settings (exclude sensitive data)
-                settings = Config.C.copy()
-                settings.pop('DISCORD_WEBHOOK_URL', None)  # Don't export webhook
-                export_data = {
-                    'version': Config.VERSION,
-                    'export_date': datetime.now().isoformat(),
-                    'export_type': 'settings',
-                    'settings': settings
-                }
-                self._send_json({'success': True, 'data': export_data})
-
-            elif path == '/api/bandwidth/status':
-                # Get current bandwidth profile status
-                self._send_json({
-                    'success': True,
-                    'scheduling_enabled': Config.C.get("BANDWIDTH_SCHEDULE_ENABLED", False),
-                    'current_profile': BandwidthScheduler.get_current_profile(),
-                    'effective_limit': BandwidthScheduler.get_effective_limit(0),
-                    'profile_a': {
-                        'start': Config.C.get("BANDWIDTH_PROFILE_A_START", "22:00"),
-                        'limit': Config.C.get("BANDWIDTH_PROFILE_A_LIMIT", 0)
-                    },
-                    'profile_b': {
-                        'start': Config.C.get("BANDWIDTH_PROFILE_B_START", "06:00"),
-                        'limit': Config.C.get("BANDWIDTH_PROFILE_B_LIMIT", 0)
-                    }
-                })
-            
-            else:
-                self._send_json({'success': False, 'error': 'Not found'}, 404)
-                
+            self._route('GET', parsed.path, parse_qs(parsed.query))
         except Exception as e:
             logger.error(f"[API] GET error: {e}")
             self._send_json({'success': False, 'error': str(e)}, 500)
     
     def do_POST(self):
-        path = self.path
-        
         try:
             data = self._read_json()
-            
-            if path == '/api/jobs':
-                job_id = DB.create_job(data)
-                self._send_json({'success': True, 'id': job_id})
-            
-            elif path.startswith('/api/jobs/') and path.endswith('/run'):
-                job_id = int(path.split('/')[-2])
-                job = DB.get_job(job_id)
-                if job:
-                    dry_run = data.get('dry_run', False)
-                    
-                    if BackupEngine.is_running():
-                        self._send_json({'success': False, 'error': 'Another backup is running'}, 409)
-                    else:
-                        thread = threading.Thread(
-                            target=BackupEngine.run_job,
-                            args=(job, dry_run, False),
-                            name=f"Backup-{job['name']}"
-                        )
-                        thread.start()
-                        self._send_json({'success': True, 'message': 'Job started'})
-                else:
-                    self._send_json({'success': False, 'error': 'Job not found'}, 404)
-            
-            elif path.startswith('/api/jobs/') and path.endswith('/toggle'):
-                job_id = int(path.split('/')[-2])
-                enabled = int(data.get('enabled', 0))
-                DB.toggle_job(job_id, enabled)
-                self._send_json({'success': True, 'enabled': enabled})
-            
-            elif path == '/api/abort':
-                BackupEngine.abort()
-                self._send_json({'success': True, 'message': 'Abort requested'})
-            
-            elif path == '/api/settings':
-                Config.C.update(data)
-                success, msg = Config.save()
-                self._send_json({'success': success, 'message': msg})
-            
-            elif path == '/api/test/wol':
-                mac = data.get('mac_address')
-                if mac:
-                    success, msg = WakeOnLan.send_magic_packet(mac)
-                    self._send_json({'success': success, 'message': msg})
-                else:
-                    self._send_json({'success': False, 'error': 'MAC address required'})
-            
-            elif path == '/api/test/ping':
-                host = data.get('host')
-                if host:
-                    reachable = WakeOnLan.ping(host)
-                    self._send_json({'success': True, 'reachable': reachable})
-                else:
-                    self._send_json({'success': False, 'error': 'Host required'})
-            
-            elif path == '/api/test/discord':
-                url = Config.C.get("DISCORD_WEBHOOK_URL", "")
-                if not url:
-                    self._send_json({'success': False, 'error': 'Discord webhook URL not configured'})
-                else:
-                    success = NotifyManager.discord_notify(
-                        "🧪 Test Notification",
-                        "This is a test message from ATP Backup",
-                        "blue"
-                    )
-                    self._send_json({'success': success, 'message': 'Test sent' if success else 'Failed to send'})
-            
-            elif path == '/api/test/mount':
-                share = data.get('share')
-                if share:
-                    success, msg = MountManager.mount(share)
-                    if success:
-                        time.sleep(2)
-                        MountManager.unmount(share)
-                    self._send_json({'success': success, 'message': msg})
-                else:
-                    self._send_json({'success': False, 'error': 'Share required'})
-            
-            elif path == '/api/import/jobs':
-                # Import jobs from JSON
-                import_data = data.get('data', {})
-                if import_data.get('export_type') != 'jobs':
-                    self._send_json({'success': False, 'error': 'Invalid export type'}, 400)
-                else:
-                    jobs = import_data.get('jobs', [])
-                    imported = 0
-                    skipped = 0
-                    for job in jobs:
-                        try:
-                            # Check if job with same name exists
-                            existing = [j for j in DB.get_jobs() if j.get('name') == job.get('name')]
-                            if existing:
-                                skipped += 1
-                                continue
-                            DB.create_job(job)
-                            imported += 1
-                        except Exception as e:
-                            logger.error(f"[API] Failed to import job: {e}")
-                            skipped += 1
-                    self._send_json({
-                        'success': True,
-                        'message': f'Imported {imported} jobs, skipped {skipped}',
-                        'imported': imported,
-                        'skipped': skipped
-                    })
-
-            elif path == '/api/import/settings':
-                # Import settings from JSON
-                import_data = data.get('data', {})
-                if import_data.get('export_type') != 'settings':
-                    self._send_json({'success': False, 'error': 'Invalid export type'}, 400)
-                else:
-                    settings = import_data.get('settings', {})
-                    # Don't overwrite sensitive settings
-                    settings.pop('DISCORD_WEBHOOK_URL', None)
-                    Config.C.update(settings)
-                    success, msg = Config.save()
-                    self._send_json({'success': success, 'message': msg})
-
-            # Database management endpoints
-            elif path == '/api/database/clear_history':
-                DB.clear_history()
-                self._send_json({'success': True, 'message': 'History cleared'})
-            
-            elif path == '/api/database/reset_statistics':
-                DB.reset_statistics()
-                self._send_json({'success': True, 'message': 'Statistics reset'})
-            
-            elif path == '/api/database/reset':
-                DB.reset_database()
-                self._send_json({'success': True, 'message': 'Database reset complete'})
-            
-            else:
-                self._send_json({'success': False, 'error': 'Not found'}, 404)
-                
+            self._route('POST', urlparse(self.path).path, data)
         except Exception as e:
             logger.error(f"[API] POST error: {e}")
             self._send_json({'success': False, 'error': str(e)}, 500)
     
     def do_PUT(self):
-        path = self.path
-        
         try:
             data = self._read_json()
-            
-            if path.startswith('/api/jobs/'):
-                job_id = int(path.split('/')[-1])
-                job = DB.get_job(job_id)
-                if job:
-                    updated = {**job, **data}
-                    DB.update_job(job_id, updated)
-                    self._send_json({'success': True})
-                else:
-                    self._send_json({'success': False, 'error': 'Job not found'}, 404)
-            else:
-                self._send_json({'success': False, 'error': 'Not found'}, 404)
-                
+            self._route('PUT', urlparse(self.path).path, data)
         except Exception as e:
             logger.error(f"[API] PUT error: {e}")
             self._send_json({'success': False, 'error': str(e)}, 500)
     
     def do_DELETE(self):
-        path = self.path
-        
         try:
-            if path.startswith('/api/jobs/'):
-                job_id = int(path.split('/')[-1])
-                DB.delete_job(job_id)
-                self._send_json({'success': True})
-            else:
-                self._send_json({'success': False, 'error': 'Not found'}, 404)
-                
+            self._route('DELETE', urlparse(self.path).path, None)
         except Exception as e:
             logger.error(f"[API] DELETE error: {e}")
             self._send_json({'success': False, 'error': str(e)}, 500)
+    
+    # ---- GET handlers (params = parsed query string) ----
+    
+    def _get_status(self, params):
+        uptime = int(time.monotonic() - START_TIME)
+        status = BackupEngine.get_status()
+        self._send_json({
+            'success': True,
+            'version': Config.VERSION,
+            'uptime': uptime,
+            'ud_available': MountManager.is_ud_available(),
+            'backup': status
+        })
+    
+    def _get_jobs(self, params):
+        jobs = DB.get_jobs()
+        last_runs = DB.get_last_runs()
+        for job in jobs:
+            job['last_run'] = last_runs.get(job['id'])
+        self._send_json({'success': True, 'jobs': jobs})
+    
+    def _get_job(self, params, job_id):
+        job_id = int(job_id)
+        job = DB.get_job(job_id)
+        if job:
+            job['last_run'] = DB.get_last_run(job_id)
+            self._send_json({'success': True, 'job': job})
+        else:
+            self._send_json({'success': False, 'error': 'Job not found'}, 404)
+    
+    def _get_history(self, params):
+        limit = int(params.get('limit', [100])[0])
+        job_id = params.get('job_id', [None])[0]
+        if job_id:
+            job_id = int(job_id)
+        history = DB.get_history(limit, job_id)
+        self._send_json({'success': True, 'history': history})
+    
+    def _get_history_log(self, params, history_id):
+        self._send_json({'success': True, 'log_output': DB.get_history_log(int(history_id))})
+    
+    def _get_stats(self, params):
+        days = int(params.get('days', [30])[0])
+        stats = DB.get_stats(days)
+        totals = DB.get_totals()
+        self._send_json({'success': True, 'stats': stats, 'totals': totals})
+    
+    def _get_logs(self, params):
+        lines = int(params.get('lines', [200])[0])
+        if os.path.exists(LOG_FILE):
+            log_content = _tail_lines(LOG_FILE, lines)
+        else:
+            log_content = "No log file found"
+        self._send_json({'success': True, 'logs': log_content})
+    
+    def _get_settings(self, params):
+        self._send_json({'success': True, 'settings': Config.C})
+    
+    def _get_export_jobs(self, params):
+        # Export all jobs as JSON (no passwords, ids or retry state)
+        jobs = DB.get_jobs_for_export()
+        export_data = {
+            'version': Config.VERSION,
+            'export_date': datetime.now().isoformat(),
+            'export_type': 'jobs',
+            'jobs': jobs
+        }
+        self._send_json({'success': True, 'data': export_data})
+    
+    def _get_export_settings(self, params):
+        # Export settings (exclude sensitive data)
+        settings = Config.C.copy()
+        settings.pop('DISCORD_WEBHOOK_URL', None)  # Don't export webhook
+        export_data = {
+            'version': Config.VERSION,
+            'export_date': datetime.now().isoformat(),
+            'export_type': 'settings',
+            'settings': settings
+        }
+        self._send_json({'success': True, 'data': export_data})
+    
+    def _get_bandwidth_status(self, params):
+        # Get current bandwidth profile status
+        current_minutes = BandwidthScheduler.current_minutes()
+        self._send_json({
+            'success': True,
+            'scheduling_enabled': Config.C.get("BANDWIDTH_SCHEDULE_ENABLED", False),
+            'current_profile': BandwidthScheduler.get_current_profile(current_minutes),
+            'effective_limit': BandwidthScheduler.get_effective_limit(0, current_minutes),
+            'profile_a': {
+                'start': Config.C.get("BANDWIDTH_PROFILE_A_START", "22:00"),
+                'limit': Config.C.get("BANDWIDTH_PROFILE_A_LIMIT", 0)
+            },
+            'profile_b': {
+                'start': Config.C.get("BANDWIDTH_PROFILE_B_START", "06:00"),
+                'limit': Config.C.get("BANDWIDTH_PROFILE_B_LIMIT", 0)
+            }
+        })
+    
+    # ---- POST handlers (data = JSON body) ----
+    
+    def _post_job(self, data):
+        job_id = DB.create_job(data)
+        Scheduler.kick()
+        self._send_json({'success': True, 'id': job_id})
+    
+    def _post_job_run(self, data, job_id):
+        job = DB.get_job(int(job_id))
+        if job:
+            dry_run = data.get('dry_run', False)
+            
+            if BackupEngine.is_running():
+                self._send_json({'success': False, 'error': 'Another backup is running'}, 409)
+            else:
+                thread = threading.Thread(
+                    target=BackupEngine.run_job,
+                    args=(job, dry_run, False),
+                    name=f"Backup-{job['name']}"
+                )
+                thread.start()
+                self._send_json({'success': True, 'message': 'Job started'})
+        else:
+            self._send_json({'success': False, 'error': 'Job not found'}, 404)
+    
+    def _post_job_toggle(self, data, job_id):
+        enabled = int(data.get('enabled', 0))
+        DB.toggle_job(int(job_id), enabled)
+        Scheduler.kick()
+        self._send_json({'success': True, 'enabled': enabled})
+    
+    def _post_abort(self, data):
+        BackupEngine.abort()
+        self._send_json({'success': True, 'message': 'Abort requested'})
+    
+    def _post_settings(self, data):
+        try:
+            if 'RSYNC_OPTIONS' in data:
+                Config.parse_rsync_options(data['RSYNC_OPTIONS'])
+        except ValueError as e:
+            self._send_json({'success': False, 'error': f'Invalid rsync options: {e}'}, 400)
+        else:
+            Config.C.update(data)
+            success, msg = Config.save()
+            Scheduler.kick()
+            self._send_json({'success': success, 'message': msg})
+    
+    def _post_test_wol(self, data):
+        mac = data.get('mac_address')
+        if mac:
+            success, msg = WakeOnLan.send_magic_packet(mac)
+            self._send_json({'success': success, 'message': msg})
+        else:
+            self._send_json({'success': False, 'error': 'MAC address required'})
+    
+    def _post_test_ping(self, data):
+        host = data.get('host')
+        if host:
+            reachable = WakeOnLan.ping(host)
+            self._send_json({'success': True, 'reachable': reachable})
+        else:
+            self._send_json({'success': False, 'error': 'Host required'})
+    
+    def _post_test_discord(self, data):
+        url = Config.C.get("DISCORD_WEBHOOK_URL", "")
+        if not url:
+            self._send_json({'success': False, 'error': 'Discord webhook URL not configured'})
+        else:
+            success = NotifyManager.discord_notify(
+                "🧪 Test Notification",
+                "This is a test message from ATP Backup",
+                "blue",
+                wait=True
+            )
+            self._send_json({'success': success, 'message': 'Test sent' if success else 'Failed to send'})
+    
+    def _post_test_mount(self, data):
+        share = data.get('share')
+        if share:
+            success, msg = MountManager.mount(share)
+            if success:
+                time.sleep(2)
+                MountManager.unmount(share)
+            self._send_json({'success': success, 'message': msg})
+        else:
+            self._send_json({'success': False, 'error': 'Share required'})
+    
+    def _post_import_jobs(self, data):
+        # Import jobs from JSON
+        import_data = data.get('data', {})
+        if import_data.get('export_type') != 'jobs':
+            self._send_json({'success': False, 'error': 'Invalid export type'}, 400)
+        else:
+            jobs = import_data.get('jobs', [])
+            imported = 0
+            skipped = 0
+            # Names are looked up in a set built once; all inserts share one commit
+            existing_names = {j['name'] for j in DB.get_jobs()}
+            with DB.transaction():
+                for job in jobs:
+                    try:
+                        # Skip jobs whose name already exists
+                        if job.get('name') in existing_names:
+                            skipped += 1
+                            continue
+                        DB.create_job(job)
+                        existing_names.add(job.get('name'))
+                        imported += 1
+                    except Exception as e:
+                        logger.error(f"[API] Failed to import job: {e}")
+                        skipped += 1
+            if imported:
+                Scheduler.kick()
+            self._send_json({
+                'success': True,
+                'message': f'Imported {imported} jobs, skipped {skipped}',
+                'imported': imported,
+                'skipped': skipped
+            })
+    
+    def _post_import_settings(self, data):
+        # Import settings from JSON
+        import_data = data.get('data', {})
+        if import_data.get('export_type') != 'settings':
+            self._send_json({'success': False, 'error': 'Invalid export type'}, 400)
+        else:
+            settings = import_data.get('settings', {})
+            # Don't overwrite sensitive settings
+            settings.pop('DISCORD_WEBHOOK_URL', None)
+            Config.C.update(settings)
+            success, msg = Config.save()
+            Scheduler.kick()
+            self._send_json({'success': success, 'message': msg})
+    
+    # Database management endpoints
+    def _post_clear_history(self, data):
+        DB.clear_history()
+        self._send_json({'success': True, 'message': 'History cleared'})
+    
+    def _post_reset_statistics(self, data):
+        DB.reset_statistics()
+        self._send_json({'success': True, 'message': 'Statistics reset'})
+    
+    def _post_reset_database(self, data):
+        DB.reset_database()
+        self._send_json({'success': True, 'message': 'Database reset complete'})
+    
+    # ---- PUT / DELETE handlers ----
+    
+    def _put_job(self, data, job_id):
+        job_id = int(job_id)
+        job = DB.get_job(job_id)
+        if job:
+            updated = {**job, **data}
+            DB.update_job(job_id, updated)
+            Scheduler.kick()
+            self._send_json({'success': True})
+        else:
+            self._send_json({'success': False, 'error': 'Job not found'}, 404)
+    
+    def _delete_job(self, data, job_id):
+        DB.delete_job(int(job_id))
+        Scheduler.kick()
+        self._send_json({'success': True})
+    
+    # Exact path -> handler (one dict lookup per request)
+    ROUTES = {
+        'GET': {
+            '/api/status': _get_status,
+            '/api/jobs': _get_jobs,
+            '/api/history': _get_history,
+            '/api/stats': _get_stats,
+            '/api/logs': _get_logs,
+            '/api/settings': _get_settings,
+            '/api/export/jobs': _get_export_jobs,
+            '/api/export/settings': _get_export_settings,
+            '/api/bandwidth/status': _get_bandwidth_status,
+        },
+        'POST': {
+            '/api/jobs': _post_job,
+            '/api/abort': _post_abort,
+            '/api/settings': _post_settings,
+            '/api/test/wol': _post_test_wol,
+            '/api/test/ping': _post_test_ping,
+            '/api/test/discord': _post_test_discord,
+            '/api/test/mount': _post_test_mount,
+            '/api/import/jobs': _post_import_jobs,
+            '/api/import/settings': _post_import_settings,
+            '/api/database/clear_history': _post_clear_history,
+            '/api/database/reset_statistics': _post_reset_statistics,
+            '/api/database/reset': _post_reset_database,
+        },
+        'PUT': {},
+        'DELETE': {},
+    }
+    
+    # Paths carrying an id: (pattern, handler), captured groups are passed as arguments
+    PATTERNS = {
+        'GET': (
+            (re.compile(r'/api/jobs/(\d+)'), _get_job),
+            (re.compile(r'/api/history/(\d+)/log'), _get_history_log),
+        ),
+        'POST': (
+            (re.compile(r'/api/jobs/(\d+)/run'), _post_job_run),
+            (re.compile(r'/api/jobs/(\d+)/toggle'), _post_job_toggle),
+        ),
+        'PUT': (
+            (re.compile(r'/api/jobs/(\d+)'), _put_job),
+        ),
+        'DELETE': (
+            (re.compile(r'/api/jobs/(\d+)'), _delete_job),
+        ),
+    }
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server that hands requests to a fixed pool of worker threads
+    instead of spawning a new thread for every request (the UI polls
+    /api/status every few seconds).
+    """
+    MAX_WORKERS = 8
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix="API")
+
+    def process_request(self, request, client_address):
+        # process_request_thread() handles finish_request, errors and shutdown_request
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
 
 # ============================================
 # MAIN
@@ -2275,7 +3138,7 @@ def main():
     
     port = Config.C['SERVER_PORT']
     try:
-        server = ThreadingHTTPServer(('0.0.0.0', port), APIHandler)
+        server = PooledHTTPServer(('0.0.0.0', port), APIHandler)
         logger.info(f"[Main] API server listening on port {port}")
         server.serve_forever()
     except OSError as e:
@@ -2287,6 +3150,8 @@ def main():
         pass
     finally:
         Scheduler.stop()
+        NotifyManager.flush_webhooks()
+        DB.close()
         if os.path.exists(Config.PID_FILE):
             try:
                 os.remove(Config.PID_FILE)
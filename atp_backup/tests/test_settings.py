@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+ATP Backup - settings round-trip tests
+
+The daemon creates its config/data directories at import time, so the module
+is loaded from source with those paths pointed at a temporary directory.
+
+Run with: python3 -m unittest discover atp_backup/tests
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from datetime import datetime
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "atp_backup.py")
+
+
+def load_daemon(root):
+    """Import atp_backup.py with CONFIG_DIR/DATA_DIR/PID_FILE under root"""
+    with open(SRC) as f:
+        source = f.read()
+    for old, new in (
+        ('CONFIG_DIR = f"/boot/config/plugins/{PLUGIN_NAME}"', f'CONFIG_DIR = {os.path.join(root, "config")!r}'),
+        ('DATA_DIR = f"/mnt/user/appdata/{PLUGIN_NAME}"', f'DATA_DIR = {os.path.join(root, "data")!r}'),
+        ('PID_FILE = f"/var/run/{PLUGIN_NAME}.pid"', f'PID_FILE = {os.path.join(root, "atp_backup.pid")!r}'),
+    ):
+        assert old in source, old
+        source = source.replace(old, new)
+    module = types.ModuleType("atp_backup")
+    module.__file__ = SRC
+    sys.modules["atp_backup"] = module  # make_dataclass resolves its module by name
+    exec(compile(source, SRC, "exec"), module.__dict__)
+    return module
+
+
+class SettingsSaveTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.m = load_daemon(cls.tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.modules.pop("atp_backup", None)
+        cls.tmp.cleanup()
+
+    def save_form(self, **values):
+        """Save settings the way the UI posts them (form-encoded strings)"""
+        self.m.Config.C.update({key: str(value) for key, value in values.items()})
+        ok, msg = self.m.Config.save()
+        self.assertTrue(ok, msg)
+
+    def test_string_values_are_coerced(self):
+        self.save_form(RETRY_MAX_ATTEMPTS=5, RETRY_INTERVAL_MINUTES=30, RETRY_ON_FAILURE="false")
+        S = self.m.Config.S
+        self.assertEqual(S.retry_max_attempts, 5)
+        self.assertEqual(S.retry_interval_minutes, 30)
+        self.assertIs(S.retry_on_failure, False)
+
+    def test_summary_trigger_after_string_save(self):
+        self.save_form(DISCORD_SUMMARY_HOUR=20,
+                       DISCORD_WEEKLY_DAY=2, DISCORD_WEEKLY_HOUR=9,
+                       DISCORD_MONTHLY_DAY=14, DISCORD_MONTHLY_HOUR=9)
+        Scheduler = self.m.Scheduler
+        sent = []
+        original = self.m.NotifyManager.send_summaries
+        self.m.NotifyManager.send_summaries = sent.append
+        try:
+            Scheduler._weekly_sent_this_week = False
+            Scheduler._monthly_sent_this_month = False
+            # 2026-01-14 is a Wednesday (weekday 2) and the 14th of the month
+            Scheduler._check_daily_summary(datetime(2026, 1, 14, 9, 0))
+        finally:
+            self.m.NotifyManager.send_summaries = original
+        self.assertEqual(sent, [['weekly', 'monthly']])
+
+
+if __name__ == "__main__":
+    unittest.main()
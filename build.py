@@ -693,6 +693,18 @@ def build_atp_backup() -> bool:
 <PLUGIN name="&name;" author="&author;" version="&version;" launch="&launch;" pluginURL="&pluginURL;" icon="{icon_attr}" min="7.0.0" support="https://github.com/gitstabs/tegenett-unraid-plugins/issues">
 
 <CHANGES>
+##2026.10.16a
+- PERF: Faster daemon - pooled SQLite connections, cached job list, fewer queries per API call and scheduler tick
+- PERF: rsync output parsed while streaming; exclude patterns passed via --exclude-from
+- PERF: Scheduler wakes on minute boundaries and right after job/settings changes; cron expressions compiled once
+- PERF: API responses via orjson when available, gzip for large responses
+- NEW: History tab shows the rsync output of each run (Log button)
+- NEW: LOG_OUTPUT_MAX_LINES setting for how much rsync output is kept per run
+- FIX: Settings saved from the UI are type-converted again (retries and weekly/monthly summaries)
+- FIX: A failed job no longer blocks later backups until the daemon restarts
+- FIX: WOL host is shut down again when the pre-backup script fails
+- DB: Schema v6 - rsync output moved to its own table, redundant history index dropped
+
 ##2026.01.31f
 - NEW: Custom plugin icon (Shield + T design by Tegenett)
 - UI: Icon now displays in Unraid plugin list